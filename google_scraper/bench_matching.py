@@ -0,0 +1,113 @@
+##Google_Maps org matching benchmark
+# Compares the original linear match_existing_org loop against the
+# OrgIndex path on synthetic organizations.
+#
+#   python google_scraper/bench_matching.py [org_count ...]
+#
+# Needs no database: importing google_scraper connects to nothing, and
+# matching runs against synthetic rows only.
+import random
+import sys
+import time
+
+from fuzzywuzzy import fuzz
+
+import google_scraper as gs
+
+WORDS = [
+    "garage", "door", "doors", "repair", "overhead", "pro", "pros", "best", "acme",
+    "elite", "precision", "express", "quality", "family", "city", "metro", "a1",
+    "service", "services", "solutions", "company", "brothers", "spring", "opener",
+]
+STATES = ["IL", "TX", "CA", "FL", "NY", "OH", "GA", "AZ"]
+
+def synthetic_orgs(count, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for org_id in range(1, count + 1):
+        name = " ".join(rng.sample(WORDS, rng.randint(2, 4))).title() + f" {org_id}"
+        phone = f"{rng.randint(200, 999)}{rng.randint(200, 999)}{rng.randint(1000, 9999)}"
+        zip_code = f"{rng.randint(10000, 99999)}"
+        rows.append((
+            org_id,
+            name,
+            [phone],
+            [f"https://www.{name.lower().replace(' ', '')}.com"],
+            {
+                "address": f"{rng.randint(1, 9999)} Main St, Springfield, {rng.choice(STATES)} {zip_code}",
+                "zip": zip_code,
+                "latitude": rng.uniform(25, 48),
+                "longitude": rng.uniform(-124, -70),
+            },
+        ))
+    return rows
+
+def synthetic_listings(rows, count, seed=11):
+    # Half are re-scrapes of known orgs, half are new businesses
+    rng = random.Random(seed)
+    listings = []
+    for i in range(count):
+        if i % 2 == 0:
+            _, name, phones, websites, addresses = rng.choice(rows)
+            listings.append((name, phones[0], websites[0], addresses["address"], None, None))
+        else:
+            name = " ".join(rng.sample(WORDS, 3)).title()
+            listings.append((name, f"555{rng.randint(1000000, 9999999)}", "", f"{i} Oak Ave, Nowhere, IL 6{i:04d}", None, None))
+    return listings
+
+def legacy_match(rows, name, phone, website, address, lat=None, lng=None):
+    # The pre-index match_existing_org loop, kept verbatim as the baseline
+    for org in rows:
+        org_id, org_name, org_phones, org_website, org_addresses = org
+        score = fuzz.token_set_ratio(name.lower(), (org_name or "").lower())
+        if score >= 85:
+            if phone and org_phones and phone in org_phones:
+                return org
+            if website and org_website:
+                if gs.extract_domain(website) == gs.extract_domain(org_website):
+                    return org
+            if address and org_addresses and address in org_addresses:
+                return org
+            if lat and lng and isinstance(org_addresses, dict):
+                try:
+                    org_lat = float(org_addresses.get('latitude', 0))
+                    org_lng = float(org_addresses.get('longitude', 0))
+                    if abs(org_lat - lat) <= 0.001 and abs(org_lng - lng) <= 0.001:
+                        return org
+                except:
+                    pass
+    return None
+
+def run(org_count, listing_count=50, legacy_limit=100_000):
+    rows = synthetic_orgs(org_count)
+    listings = synthetic_listings(rows, listing_count)
+
+    start = time.perf_counter()
+    gs.ORG_INDEX = gs.OrgIndex(list(rows))
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [gs.match_existing_org(*listing) for listing in listings]
+    indexed_s = time.perf_counter() - start
+
+    print(f"orgs={org_count:,} listings={listing_count}")
+    print(f"  index build        {build_s:8.3f}s")
+    print(f"  indexed match      {indexed_s * 1000 / listing_count:8.3f} ms/listing")
+
+    if org_count > legacy_limit:
+        print("  legacy loop        skipped (too slow at this size)")
+        return
+    start = time.perf_counter()
+    legacy = [legacy_match(rows, *listing) for listing in listings]
+    legacy_s = time.perf_counter() - start
+    agree = sum(
+        (a.id if a else None) == (b[0] if b else None) for a, b in zip(indexed, legacy)
+    )
+    print(f"  legacy loop        {legacy_s * 1000 / listing_count:8.3f} ms/listing "
+          f"({legacy_s / max(indexed_s, 1e-9):.0f}x slower)")
+    print(f"  agreement          {agree}/{listing_count}")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        run(size)
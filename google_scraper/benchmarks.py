@@ -0,0 +1,383 @@
+##Google_Maps hot-path benchmarks
+# Times the stages that dominate a scrape run and writes one JSON object per
+# result, so runs can be diffed against a saved baseline:
+#
+#   python google_scraper/benchmarks.py --output bench.jsonl
+#   python google_scraper/benchmarks.py --baseline bench.jsonl
+#   python google_scraper/benchmarks.py --sizes 10000 100000 1000000
+#
+# Review insertion and the org upsert checks run only when BENCH_DB_URL
+# points at a scratch PostgreSQL (with PostGIS); they write to TEMP reviews
+# and organizations tables on that connection. Nothing else touches a
+# database.
+#
+# --standin replays pages recorded with GOOGLE_SNAPSHOT_RECORD_DIR through
+# maps_standin.py and times scrape_query end to end in headless Chrome. It
+# writes to the same TEMP tables, so it also needs BENCH_DB_URL, and it is
+# skipped when Chrome does not start:
+#
+#   python google_scraper/benchmarks.py --standin ./snapshots \
+#       --standin-queries "garage door repair Chicago IL"
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import google_scraper as gs
+import maps_standin
+from bench_matching import synthetic_orgs, synthetic_listings
+
+HOURS_SAMPLES = [
+    ("Monday", "8 AM–5 PM"),
+    ("Tuesday", "Open 24 hours"),
+    ("Wednesday", "7 AM–7 PM (Independence Day)  Hours might differ"),
+    ("Thursday", "Closed"),
+    ("Friday", "9 AM–12 PM, 1–6 PM"),
+    ("Saturday", "10 AM–2 PM Holiday hours"),
+    ("Sunday", ""),
+]
+PLACE_URL = (
+    "https://www.google.com/maps/place/Acme+Garage+Door+Repair/data=!4m7!3m6"
+    "!1s0x880e2ca6e1a2b1b1:0x5b3e1c2d3f4a5b6c!8m2!3d41.8781136!4d-87.6297982"
+    "!16s%2Fg%2F11c1q8z7x3!19sChIJsbGi4aYsDogRbFtKPy0cPls?authuser=0&hl=en&rclk=1"
+)
+
+def git_rev():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), text=True
+        ).strip()
+    except Exception:
+        return None
+
+def measure(name, fn, ops, repeat=7, **meta):
+    # Median of `repeat` runs; pass repeat=1 for anything that is not idempotent.
+    # spread_pct is the min-max range as a percentage of the median, which
+    # compare() uses as the case's noise floor
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+    return {
+        "bench": name,
+        "ops": ops,
+        "seconds": round(seconds, 6),
+        "us_per_op": round(seconds / ops * 1e6, 3) if ops else None,
+        "spread_pct": round((max(timings) - min(timings)) / seconds * 100, 1) if seconds else 0.0,
+        **meta,
+    }
+
+def bench_match(sizes, listing_count=200):
+    results = []
+    for size in sizes:
+        rows = synthetic_orgs(size)
+        listings = synthetic_listings(rows, listing_count)
+
+        def build():
+            gs.ORG_INDEX = gs.OrgIndex(list(rows))
+        results.append(measure("org_index_build", build, size, repeat=1, size=size))
+        results.append(measure(
+            "match_existing_org", lambda: [gs.match_existing_org(*l) for l in listings],
+            listing_count, size=size,
+        ))
+    return results
+
+def traced_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0], kept
+    finally:
+        tracemalloc.stop()
+
+def bench_org_memory(size=100_000):
+    # Resident size of the loaded organizations: decoded DB rows (what used to
+    # be kept) vs OrgRecords vs the full OrgIndex
+    results = []
+    for name, build in (
+        ("org_rows_memory", lambda: synthetic_orgs(size)),
+        ("org_records_memory", lambda: [gs.OrgRecord.from_row(r) for r in synthetic_orgs(size)]),
+        ("org_index_memory", lambda: gs.OrgIndex(synthetic_orgs(size))),
+    ):
+        used, _ = traced_bytes(build)
+        results.append({"bench": name, "ops": size, "bytes": used, "bytes_per_op": round(used / size, 1), "size": size})
+    return results
+
+def synthetic_scraped(count, prefix="place", seed=3):
+    # scraped_data dicts for known orgs, each with its own place ID
+    rows = synthetic_orgs(1000)
+    rng = random.Random(seed)
+    listings = []
+    for i in range(count):
+        _, name, phones, websites, addresses = rng.choice(rows)
+        listings.append({
+            "Name": name, "Name Raw": name, "Slug": name.lower().replace(" ", "-"), "Phone": phones[0],
+            "Website": websites[0], "Address": addresses["address"], "ZIP": addresses["zip"], "Rating": 4.6,
+            "review_count": rng.randint(0, 500), "Place ID": f"{prefix}-{i}",
+            "Hours": gs.hours_json(HOURS_SAMPLES), "Latitude": addresses["latitude"],
+            "Longitude": addresses["longitude"], "Source": "google_maps", "reviews": [],
+        })
+    return listings
+
+def bench_org_columns(count=50_000):
+    # Payload shared by the single and batched org upserts
+    listings = synthetic_scraped(count)
+    return [measure("org_columns", lambda: [gs._org_columns(l) for l in listings], count)]
+
+def bench_hours(count=20_000):
+    return [
+        measure("clean_hours_text", lambda: [gs.clean_hours_text(t) for _ in range(count) for _, t in HOURS_SAMPLES],
+                count * len(HOURS_SAMPLES)),
+        measure("hours_json", lambda: [gs.hours_json(HOURS_SAMPLES) for _ in range(count)], count),
+    ]
+
+def bench_place_url(count=100_000):
+    return [measure("parse_place_url", lambda: [gs.parse_place_url(PLACE_URL) for _ in range(count)], count)]
+
+def synthetic_reviews(count, prefix):
+    return [
+        {"reviewer": f"Reviewer {i}", "rating": float(1 + i % 5), "date": "a week ago",
+         "review": "Fixed our spring the same day. " * (1 + i % 4), "source_id": f"{prefix}-{i}"}
+        for i in range(count)
+    ]
+
+REVIEW_TABLE_SQL = """
+    CREATE TEMP TABLE reviews (
+        id serial PRIMARY KEY, reviewer text, rating double precision, review text,
+        source text, org_id integer, source_id text UNIQUE, content_hash text
+    )
+"""
+
+def bench_reviews(count=2000):
+    db_url = os.getenv("BENCH_DB_URL")
+    if not db_url:
+        print("BENCH_DB_URL not set, skipping review insert benchmarks")
+        return []
+    # One pooled connection, so the TEMP table is visible to every statement
+    db = gs.DBPool(db_url, maxconn=1)
+    db.execute(REVIEW_TABLE_SQL)
+    write_db, gs.WRITE_DB = gs.WRITE_DB, db
+    try:
+        fresh = synthetic_reviews(count, "row")
+        results = [measure("insert_review", lambda: [gs.insert_review(r, 1) for r in fresh], count, repeat=1, db=True)]
+        # Same reviews again: every row conflicts and matches its content_hash
+        results.append(measure("insert_review_conflict", lambda: [gs.insert_review(r, 1) for r in fresh], count, repeat=1, db=True))
+
+        batch = synthetic_reviews(count, "sink")
+        sink = gs.ReviewSink(max_rows=500, max_age=3600)
+
+        def run_sink():
+            sink.add_many(batch, 1)
+            sink.flush()
+        results.append(measure("review_sink", run_sink, count, repeat=1, db=True))
+    finally:
+        gs.WRITE_DB = write_db
+        db.close()
+    return results
+
+ORG_TABLE_SQL = """
+    CREATE TEMP TABLE organizations (
+        id serial PRIMARY KEY, name text, name_raw text, slug text, phones jsonb, website jsonb,
+        addresses jsonb, google_rating double precision, review_count integer, avg_rating double precision,
+        source_ids jsonb, ids jsonb, hours jsonb, google_id text UNIQUE, review_excerpt text,
+        canonical_abbr text, geom_m geometry, google_place_url text, website_domain text, source text,
+        content_hash text
+    )
+"""
+
+def expect(label, result, action):
+    if result[1] != action:
+        raise AssertionError(f"org upsert {label}: expected {action}, got {result}")
+    return result[0]
+
+def check_org_upserts():
+    # Each path through upsert_organization / upsert_organizations, in order
+    a, b, d, e = synthetic_scraped(4, prefix="check")
+    a_id = expect("insert", gs.upsert_organization(a), "inserted")
+    expect("unchanged", gs.upsert_organization(a), "no_update")
+    assert expect("merge by google_id", gs.upsert_organization(dict(a, Rating=1.0)), "updated") == a_id
+    assert expect("matched update", gs.upsert_organization(b, match_id=a_id), "updated") == a_id
+    expect("matched unchanged", gs.upsert_organization(b, match_id=a_id), "no_update")
+
+    # bench_org_upserts runs on a one-connection pool: with the id type cache
+    # cold, a nested checkout inside the batch statement would never return
+    gs.org_id_type.cache_clear()
+    out = []
+    worker = threading.Thread(
+        target=lambda: out.append(gs.upsert_organizations([d, dict(d), b, e], [None, None, a_id, None])),
+        daemon=True,
+    )
+    worker.start()
+    worker.join(timeout=30)
+    if not out:
+        raise AssertionError("batch upsert did not return on a one-connection pool")
+    batch = out[0]
+    for label, result, action in zip(("insert", "repeated google_id", "matched unchanged", "insert"), batch,
+                                     ("inserted", "no_update", "no_update", "inserted")):
+        expect(f"batch {label}", result, action)
+    assert batch[0][0] == batch[1][0] and batch[2][0] == a_id
+    assert expect("batch merge by google_id", gs.upsert_organizations([dict(d, Rating=2.0)], [None])[0],
+                  "updated") == batch[0][0]
+
+    # Two listings of one business in a persist_listings batch: the second follows the first
+    twin = dict(e, **{"Place ID": None, "Name Raw": e["Name"] + " Inc"})
+    if gs._batch_duplicates([e, twin], [None, None]) != [None, 0]:
+        raise AssertionError("batch dedup: second listing not matched to the first")
+
+def bench_org_upserts(count=500):
+    db_url = os.getenv("BENCH_DB_URL")
+    if not db_url:
+        print("BENCH_DB_URL not set, skipping org upsert checks and benchmarks")
+        return []
+    # Needs PostGIS for geom_m; one pooled connection so the TEMP table is visible everywhere
+    db = gs.DBPool(db_url, maxconn=1)
+    db.execute(ORG_TABLE_SQL)
+    write_db, gs.WRITE_DB = gs.WRITE_DB, db
+    gs.org_id_type.cache_clear()
+    try:
+        check_org_upserts()
+        listings = synthetic_scraped(count, prefix="bench")
+        nones = [None] * count
+        return [
+            measure("upsert_organizations", lambda: gs.upsert_organizations(listings, nones), count, repeat=1, db=True),
+            # Same listings again: every row conflicts and matches its content_hash
+            measure("upsert_organizations_unchanged", lambda: gs.upsert_organizations(listings, nones),
+                    count, repeat=1, db=True),
+        ]
+    finally:
+        gs.WRITE_DB = write_db
+        gs.org_id_type.cache_clear()
+        db.close()
+
+def bench_standin(snapshot_dir, queries, latency=0.0):
+    if not snapshot_dir:
+        return []
+    db_url = os.getenv("BENCH_DB_URL")
+    if not db_url:
+        print("BENCH_DB_URL not set, skipping the stand-in scrape benchmark")
+        return []
+    try:
+        driver = gs.start_chrome(gs.build_chrome_options())
+    except Exception as e:
+        print(f"Chrome unavailable ({type(e).__name__}), skipping the stand-in scrape benchmark")
+        return []
+    # Port 0 lets the OS pick a free one
+    server = maps_standin.serve(snapshot_dir, port=0, latency=latency, background=True)
+    db = gs.DBPool(db_url, maxconn=1)
+    db.execute(ORG_TABLE_SQL)
+    db.execute(REVIEW_TABLE_SQL)
+    saved = (gs.WRITE_DB, gs.MAPS_BASE_URL, gs.QUERY_PAUSE, gs.OUTPUT_DIR)
+    gs.WRITE_DB = db
+    gs.MAPS_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/maps"
+    gs.QUERY_PAUSE = (0.0,)
+    gs.org_id_type.cache_clear()
+    scraped = []
+    try:
+        with tempfile.TemporaryDirectory() as out_dir:
+            gs.OUTPUT_DIR = out_dir
+            # Writes run inline (no writer thread), so each query's time includes its DB work
+            result = measure(
+                "scrape_query_standin",
+                lambda: scraped.extend(gs.scrape_query(driver, q, f"{i + 1}/{len(queries)}", [])
+                                       for i, q in enumerate(queries)),
+                len(queries), repeat=1, db=True, latency=latency,
+            )
+    finally:
+        gs.WRITE_DB, gs.MAPS_BASE_URL, gs.QUERY_PAUSE, gs.OUTPUT_DIR = saved
+        gs.org_id_type.cache_clear()
+        driver.quit()
+        server.shutdown()
+        server.server_close()
+        db.close()
+    if None in scraped:
+        print(f"{scraped.count(None)} stand-in queries failed; check that they were recorded")
+    result["listings"] = sum(n or 0 for n in scraped)
+    return [result]
+
+def bench_csv(count=5000):
+    rows = []
+    for i in range(count):
+        rows.append({
+            "Search Query": "garage door repair Chicago IL", "Name Raw": f"Acme {i}", "Name": f"Acme {i}",
+            "Slug": f"acme-{i}", "Address": f"{i} Main St, Chicago, IL 60601", "Phone": "3125551234",
+            "Rating": 4.7, "Website": "https://acme.com", "Website Domain": "acme.com",
+            "Google Place URL": PLACE_URL, "Latitude": 41.87, "Longitude": -87.62, "Place ID": "11c1q8z7x3",
+            "Hours": gs.hours_json(HOURS_SAMPLES), "ids.external": "11c1q8z7x3", "review_excerpt": "Great",
+            "review_count": 3, "reviews": synthetic_reviews(3, str(i)), "ZIP": "60601", "Source": "google_maps",
+        })
+    with tempfile.TemporaryDirectory() as out_dir:
+        return [measure("save_to_csv", lambda: gs.save_to_csv(rows, out_dir, "bench.csv"), count)]
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["bench"], r.get("size")): r for r in map(json.loads, f)}
+    regressions = 0
+    print(f"\n{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for r in results:
+        base = baseline.get((r["bench"], r.get("size")))
+        # Timing cases compare us_per_op, memory cases bytes_per_op
+        metric, unit = ("us_per_op", "us") if "us_per_op" in r else ("bytes_per_op", "B")
+        if not base or not base.get(metric) or r.get(metric) is None:
+            continue
+        change = (r[metric] - base[metric]) / base[metric] * 100
+        # A case whose own runs vary more than the threshold only counts as
+        # slower once the change clears that noise
+        noise = max(threshold, r.get("spread_pct", 0.0), base.get("spread_pct", 0.0))
+        flag = "  REGRESSION" if change > noise else ""
+        regressions += bool(flag)
+        label = r["bench"] + (f"@{r['size']:,}" if r.get("size") else "")
+        print(f"{label:<28} {base[metric]:>10.2f}{unit:<2} {r[metric]:>10.2f}{unit:<2} {change:>+7.1f}%{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Google scraper's hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="synthetic org counts for match_existing_org (add 1000000 for the full run)")
+    parser.add_argument("--output", help="write JSON lines here instead of stdout")
+    parser.add_argument("--baseline", help="JSON lines from an earlier run to compare against")
+    parser.add_argument("--standin", metavar="SNAPSHOT_DIR",
+                        help="recorded snapshots to replay through maps_standin.py with scrape_query")
+    parser.add_argument("--standin-queries", nargs="+", default=[],
+                        help="search queries recorded in SNAPSHOT_DIR")
+    parser.add_argument("--standin-latency", type=float, default=0.0,
+                        help="seconds the stand-in adds to every response")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent slowdown reported as a regression (raised per case to its run-to-run spread)")
+    args = parser.parse_args()
+    if args.standin and not args.standin_queries:
+        parser.error("--standin needs --standin-queries")
+
+    results = (
+        bench_match(args.sizes)
+        + bench_org_memory()
+        + bench_org_columns()
+        + bench_hours()
+        + bench_place_url()
+        + bench_reviews()
+        + bench_org_upserts()
+        + bench_csv()
+        + bench_standin(args.standin, args.standin_queries, args.standin_latency)
+    )
+    stamp = {"run_at": datetime.now().isoformat(timespec="seconds"), "git_rev": git_rev()}
+    lines = [json.dumps({**r, **stamp}) for r in results]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        print(f"Wrote {len(lines)} results to {args.output}")
+    else:
+        print("\n".join(lines))
+
+    if args.baseline and compare(results, args.baseline, args.threshold):
+        raise SystemExit(1)
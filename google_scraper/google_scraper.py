@@ -11,22 +11,489 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (
+    NoSuchElementException, StaleElementReferenceException, TimeoutException
+)
+from functools import lru_cache
 from fuzzywuzzy import fuzz
+from fuzzywuzzy import utils as fuzz_utils
 import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import os
+import socket
+import sys
 import json
+import hashlib
+import queue
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+except ImportError:  # fall back to fuzzywuzzy, one pair at a time
+    rf_fuzz = rf_process = None
 
 from gdh_collect.utils.cleaning import (
     clean_name, slugify, clean_phone, normalize_address,
     extract_domain, to_float
 )
+from gdh_collect.utils.helpers import save_to_csv
 
 # ─────────────────────────────────────────────
 # Database Connection for Organization Matching
 # ─────────────────────────────────────────────
-# Load DB credentials from environment variables
-READ_CONN = psycopg2.connect(os.getenv("READ_DB_URL"))
-WRITE_CONN = psycopg2.connect(os.getenv("WRITE_DB_URL"))
+DB_POOL_SIZE = int(os.getenv("GOOGLE_DB_POOL_SIZE", "8"))
+DB_RETRIES = int(os.getenv("GOOGLE_DB_RETRIES", "3"))
+# Connections idle longer than this get a SELECT 1 before they are handed out
+DB_HEALTHCHECK_SECONDS = 30
+# Errors that mean the connection is gone, not that the statement was wrong
+DB_CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+class DBPool:
+    """Thread-safe connection pool with health checks and reconnect-and-retry.
+
+    run() executes a unit of work in its own transaction. When the
+    connection drops mid-statement it is thrown away, and the work is
+    retried on a fresh connection up to DB_RETRIES times. Any other error
+    is rolled back and raised to the caller.
+
+    ThreadedConnectionPool raises PoolError instead of waiting once maxconn
+    connections are out, so checkouts go through a semaphore of the same
+    size and extra threads block until a connection is returned. fn must
+    therefore not check out a second connection from the same pool.
+    """
+
+    def __init__(self, dsn, maxconn=DB_POOL_SIZE):
+        self.pool = ThreadedConnectionPool(1, maxconn, dsn)
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.last_used = {}
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        conn = self.pool.getconn()
+        # Connections the pool just opened have no last_used entry yet
+        idle = time.time() - self.last_used.get(id(conn), time.time())
+        if conn.closed or (idle > DB_HEALTHCHECK_SECONDS and not self._healthy(conn)):
+            self.last_used.pop(id(conn), None)
+            self.pool.putconn(conn, close=True)
+            conn = self.pool.getconn()
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a healthy connection; it is rolled back and returned on exit."""
+        self.slots.acquire()
+        try:
+            conn = self._checkout()
+        except BaseException:
+            self.slots.release()
+            raise
+        broken = False
+        try:
+            yield conn
+        except DB_CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            if not broken and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            broken = broken or bool(conn.closed)
+            if broken:
+                self.last_used.pop(id(conn), None)
+            else:
+                self.last_used[id(conn)] = time.time()
+            try:
+                self.pool.putconn(conn, close=broken)
+            finally:
+                self.slots.release()
+
+    def run(self, fn, retries=DB_RETRIES):
+        """Call fn(cursor) in a transaction, commit, and return its result."""
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cur:
+                        result = fn(cur)
+                    conn.commit()
+                    return result
+            except DB_CONNECTION_ERRORS as e:
+                if attempt == retries:
+                    raise
+                print(f"DB connection lost ({type(e).__name__}: {str(e).strip()}), "
+                      f"retrying on a new connection ({attempt + 1}/{retries})...")
+                METRICS.inc("db_retries")
+                time.sleep(min(2 ** attempt, 10))
+
+    def execute(self, sql, params=None):
+        """Run one statement; returns its rowcount."""
+        def work(cur):
+            cur.execute(sql, params)
+            return cur.rowcount
+        return self.run(work)
+
+    def fetchone(self, sql, params=None):
+        def work(cur):
+            cur.execute(sql, params)
+            return cur.fetchone()
+        return self.run(work)
+
+    def fetchall(self, sql, params=None):
+        def work(cur):
+            cur.execute(sql, params)
+            return cur.fetchall()
+        return self.run(work)
+
+    def close(self):
+        self.pool.closeall()
+
+# Opened by init_scraper() (or scraper_context()), not at import, so tools
+# that only need the helpers never touch the database
+READ_DB = None
+WRITE_DB = None
+
+# Serializes matching and org writes, so pool workers never insert the
+# same organization twice
+WRITE_LOCK = threading.RLock()
+
+def connect_db():
+    global READ_DB, WRITE_DB
+    with WRITE_LOCK:
+        if READ_DB is None:
+            # Load DB credentials from environment variables
+            READ_DB = DBPool(os.getenv("READ_DB_URL"))
+        if WRITE_DB is None:
+            WRITE_DB = DBPool(os.getenv("WRITE_DB_URL"))
+
+def init_scraper():
+    """Connect to the databases and, in memory match mode, load ORG_INDEX. Safe to call twice."""
+    global ORG_INDEX, ORG_INDEX_LOADED
+    # Any other value would skip the org load and insert every listing as new
+    if ORG_MATCH_MODE not in ORG_MATCH_MODES:
+        raise ValueError(f"ORG_MATCH_MODE must be one of {ORG_MATCH_MODES}, got {ORG_MATCH_MODE!r}")
+    with WRITE_LOCK:
+        connect_db()
+        if ORG_MATCH_MODE == "memory" and not ORG_INDEX_LOADED:
+            start = time.time()
+            ORG_INDEX = OrgIndex(fetch_existing_orgs())
+            ORG_INDEX_LOADED = True
+            print(f"Loaded {len(ORG_INDEX)} organizations for matching in {time.time() - start:.1f}s")
+
+def close_scraper():
+    global READ_DB, WRITE_DB
+    with WRITE_LOCK:
+        for db in (READ_DB, WRITE_DB):
+            if db is not None:
+                db.close()
+        READ_DB = WRITE_DB = None
+
+@contextmanager
+def scraper_context():
+    """`with scraper_context():` runs init_scraper() and closes the connections on exit."""
+    init_scraper()
+    try:
+        yield
+    finally:
+        close_scraper()
+
+# ─────────────────────────────────────────────
+# ⏱️ Event-Driven Waits
+# ─────────────────────────────────────────────
+# Ceiling (seconds) per call site; each wait returns as soon as its DOM
+# condition holds. Override one with e.g. GOOGLE_WAIT_REVIEW_SCROLL=5
+WAIT_CEILINGS = {
+    "share_dialog": 5.0,
+    "share_close": 2.0,
+    "overlay_close": 3.0,
+    "pane_close": 2.0,
+    "hours_expand": 2.0,
+    "reviews_tab": 5.0,
+    "reviews_load": 5.0,
+    "review_scroll": 3.0,
+    "review_sort": 3.0,
+    "feed_appear": 2.0,
+    "feed_scroll": 2.0,
+    "search_reload": 10.0,
+    "listing_settle": 0.5,
+    "tab_navigate": 10.0,
+}
+for _site in WAIT_CEILINGS:
+    _override = os.getenv(f"GOOGLE_WAIT_{_site.upper()}")
+    if _override:
+        WAIT_CEILINGS[_site] = float(_override)
+
+WAIT_POLL = 0.1
+# Random pause between queries (min,max seconds); "0" disables it
+QUERY_PAUSE = tuple(float(x) for x in os.getenv("GOOGLE_QUERY_PAUSE", "1,3").split(","))
+
+WAIT_STATS = {}  # site -> [calls, seconds waited, longest wait, timeouts]
+WAIT_STATS_LOCK = threading.Lock()
+
+def record_wait(site, seconds, timed_out=False):
+    with WAIT_STATS_LOCK:
+        stats = WAIT_STATS.setdefault(site, [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        stats[3] += int(timed_out)
+
+def wait_until(driver, condition, site, timeout=None):
+    """Poll condition(driver) until it returns something truthy.
+
+    Gives up after the site's ceiling in WAIT_CEILINGS and returns False
+    instead of raising. Time spent is recorded under site for wait_report().
+    """
+    ceiling = WAIT_CEILINGS[site] if timeout is None else timeout
+    start = time.time()
+    try:
+        result = WebDriverWait(
+            driver, ceiling, poll_frequency=WAIT_POLL,
+            ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)
+        ).until(condition)
+    except TimeoutException:
+        result = False
+    record_wait(site, time.time() - start, timed_out=not result)
+    return result
+
+def count_elements(driver, selector):
+    # One round trip that returns a number, without materializing element refs
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", selector)
+
+def count_grows(selector, previous):
+    """Condition: more than `previous` elements match selector; returns the new count."""
+    def condition(driver):
+        count = count_elements(driver, selector)
+        return count if count > previous else False
+    return condition
+
+def pause_between_queries():
+    low, high = (QUERY_PAUSE * 2)[:2]
+    seconds = random.uniform(low, high) if high > 0 else 0.0
+    if seconds:
+        time.sleep(seconds)
+        record_wait("query_pause", seconds)
+
+def wait_report():
+    with WAIT_STATS_LOCK:
+        items = sorted(WAIT_STATS.items(), key=lambda kv: kv[1][1], reverse=True)
+    print("\n--- Wait time by call site ---")
+    for site, (calls, total, longest, timeouts) in items:
+        print(f"{site:<16} {calls:>6} calls {total:>9.1f}s total {total / calls:>6.2f}s avg "
+              f"{longest:>6.2f}s max {timeouts:>5} at ceiling")
+
+# ─────────────────────────────────────────────
+# 📊 Run Metrics (per-stage timings and counters)
+# ─────────────────────────────────────────────
+# GOOGLE_METRICS_PORT serves Prometheus text at http://<host>:<port>/metrics
+# for the length of the run; GOOGLE_METRICS_HOST defaults to loopback, set
+# it to 0.0.0.0 to scrape a node from elsewhere. GOOGLE_METRICS_FILE gets one
+# JSON line per listing plus a summary line at the end; "" disables it.
+METRICS_PORT = int(os.getenv("GOOGLE_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("GOOGLE_METRICS_HOST", "127.0.0.1")
+METRICS_FILE = os.getenv("GOOGLE_METRICS_FILE")
+
+# Histogram bucket upper bounds in seconds
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STAGES = (
+    "search_load", "feed_scroll", "listing_nav", "listing_load", "share_link", "hours",
+    "review_scroll", "review_extract", "match", "db_write", "review_flush",
+)
+# Per-run delta: what each org and review write did, by content_hash
+DELTA_COUNTERS = (
+    "orgs_new", "orgs_changed", "orgs_unchanged", "reviews_new", "reviews_changed", "reviews_unchanged",
+)
+COUNTERS = (
+    "listings_scraped", "listings_skipped", "listings_failed", "listings_fresh", "listings_duplicate",
+    "search_retries", "db_retries",
+) + DELTA_COUNTERS
+
+class Metrics:
+    """Stage histograms and event counters shared by every worker thread.
+
+    stage() times a block into its histogram. While a thread is inside
+    begin_listing()/end_listing() the same timings are also summed into that
+    listing's trace, which end_listing() writes as one JSON line. Writes
+    queued with submit_traced() carry the trace to the writer thread, and
+    the line is queued behind them, so it includes the listing's DB stages.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.file = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # stage -> [count per bucket, +Inf count, sum]
+            self.histograms = {s: [[0] * len(STAGE_BUCKETS), 0, 0.0] for s in STAGES}
+            self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            buckets, _, _ = hist = self.histograms.setdefault(stage, [[0] * len(STAGE_BUCKETS), 0, 0.0])
+            for i, bound in enumerate(STAGE_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+                    break
+            hist[1] += 1
+            hist[2] += seconds
+        trace = getattr(self.local, "trace", None)
+        if trace is not None:
+            trace[stage] = round(trace.get(stage, 0.0) + seconds, 3)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.time() - start)
+
+    def inc(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def begin_listing(self):
+        self.local.trace = {}
+        self.local.started = time.time()
+
+    def current_trace(self):
+        return getattr(self.local, "trace", None)
+
+    def traced(self, trace, fn, *args):
+        """Call fn with trace as this thread's listing trace, e.g. on the writer thread."""
+        previous = self.current_trace()
+        self.local.trace = trace
+        try:
+            return fn(*args)
+        finally:
+            self.local.trace = previous
+
+    def end_listing(self, query, href, outcome):
+        trace = self.current_trace()
+        self.local.trace = None
+        if trace is None:
+            return
+        self.inc(f"listings_{outcome}")
+        # Behind the listing's queued writes, which still add their stages to trace
+        submit_write(self.write, {
+            "type": "listing", "at": datetime.now().isoformat(timespec="seconds"),
+            "query": query, "href": href, "outcome": outcome,
+            "seconds": round(time.time() - self.local.started, 3), "stages": trace,
+        })
+
+    def open(self, path):
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, record):
+        if self.file:
+            with self.lock:
+                self.file.write(json.dumps(record) + "\n")
+                self.file.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "histograms": {
+                    s: {"count": n, "sum": round(total, 3), "buckets": list(buckets)}
+                    for s, (buckets, n, total) in self.histograms.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def prometheus_text(self):
+        snap = self.snapshot()
+        lines = [
+            "# HELP google_scraper_stage_seconds Time spent per scrape stage.",
+            "# TYPE google_scraper_stage_seconds histogram",
+        ]
+        for stage, hist in snap["histograms"].items():
+            cumulative = 0
+            for bound, count in zip(STAGE_BUCKETS, hist["buckets"]):
+                cumulative += count
+                lines.append(f'google_scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'google_scraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'google_scraper_stage_seconds_sum{{stage="{stage}"}} {hist["sum"]}')
+            lines.append(f'google_scraper_stage_seconds_count{{stage="{stage}"}} {hist["count"]}')
+        for name, value in snap["counters"].items():
+            lines.append(f"# TYPE google_scraper_{name}_total counter")
+            lines.append(f"google_scraper_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        snap = self.snapshot()
+        print("\n--- Time by stage ---")
+        for stage, hist in sorted(snap["histograms"].items(), key=lambda kv: kv[1]["sum"], reverse=True):
+            if hist["count"]:
+                print(f"{stage:<16} {hist['count']:>6} calls {hist['sum']:>9.1f}s total "
+                      f"{hist['sum'] / hist['count']:>6.2f}s avg")
+        counters = snap["counters"]
+        print(" | ".join(f"{name}: {value}" for name, value in counters.items() if name not in DELTA_COUNTERS))
+        print("\n--- Changes this run ---")
+        for kind in ("orgs", "reviews"):
+            print(f"{kind:<8} {counters[kind + '_new']:>7} new {counters[kind + '_changed']:>7} changed "
+                  f"{counters[kind + '_unchanged']:>7} unchanged")
+
+    def close(self):
+        self.write({"type": "summary", "at": datetime.now().isoformat(timespec="seconds"), **self.snapshot()})
+        if self.file:
+            self.file.close()
+            self.file = None
+
+METRICS = Metrics()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = METRICS.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_metrics():
+    """Open the metrics file and endpoint; returns the HTTP server or None."""
+    path = METRICS_FILE if METRICS_FILE is not None else os.path.join(OUTPUT_DIR, "metrics.jsonl")
+    METRICS.open(path)
+    if not METRICS_PORT:
+        return None
+    server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"Serving metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    return server
+
+def stop_metrics(server):
+    METRICS.report()
+    METRICS.close()
+    if server:
+        server.shutdown()
+        server.server_close()
 
 # ─────────────────────────────────────────────
 # 📎 Helper: Get Google Maps Share Link (Short URL)
@@ -35,18 +502,16 @@ def get_share_link(driver):
     try:
         share_btn = driver.find_element(By.XPATH, '//button[@aria-label="Share"]')
         driver.execute_script("arguments[0].scrollIntoView(true);", share_btn)
-        time.sleep(0.5)
         share_btn.click()
-        WebDriverWait(driver, 5).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, 'input.vrsrZe'))
+        link_input = wait_until(
+            driver, EC.visibility_of_element_located((By.CSS_SELECTOR, 'input.vrsrZe')), "share_dialog"
         )
-        link_input = driver.find_element(By.CSS_SELECTOR, 'input.vrsrZe')
         short_link = link_input.get_attribute('value')
 
         overlay = driver.find_element(By.CSS_SELECTOR, 'div.hoUMge')
         close_btn = overlay.find_element(By.CSS_SELECTOR, 'button[aria-label="Close"]')
         driver.execute_script("arguments[0].click();", close_btn)
-        time.sleep(0.5)
+        wait_until(driver, EC.invisibility_of_element_located((By.CSS_SELECTOR, 'input.vrsrZe')), "share_close")
 
         return short_link
     except:
@@ -61,9 +526,7 @@ def dismiss_overlay(driver):
             print("Overlay detected, dismissing...")
             close_btn = overlay.find_element(By.CSS_SELECTOR, 'button[aria-label="Close"]')
             driver.execute_script("arguments[0].click();", close_btn)
-            WebDriverWait(driver, 3).until_not(
-                lambda d: d.find_element(By.CSS_SELECTOR, 'div.hoUMge').is_displayed()
-            )
+            wait_until(driver, EC.invisibility_of_element_located((By.CSS_SELECTOR, 'div.hoUMge')), "overlay_close")
             return True
     except:
         pass
@@ -77,174 +540,747 @@ def close_place_details(driver):
     try:
         close_btn = driver.find_element(By.CSS_SELECTOR, 'button[jsaction="pane.place.close"]')
         close_btn.click()
-        time.sleep(1)
+        wait_until(
+            driver, EC.invisibility_of_element_located((By.CSS_SELECTOR, 'button[jsaction="pane.place.close"]')),
+            "pane_close"
+        )
     except:
         pass  # Sometimes details are already closed
 
 # Helper to fetch city queries from the production database
 def fetch_city_queries():
-    with READ_CONN.cursor() as cur:
-        cur.execute("SELECT name, state FROM cities")
-        rows = cur.fetchall()
+    rows = READ_DB.fetchall("SELECT name, state FROM cities")
     return [f"garage door repair {city} {state}" for city, state in rows]
 
+ORG_LOAD_BATCH = 10_000
+
 def fetch_existing_orgs():
-    with READ_CONN.cursor() as cur:
-        cur.execute("""
-            SELECT id, name, phones, website, addresses
-            FROM organizations
-        """)
-        return cur.fetchall()
-    
-EXISTING_ORGS = fetch_existing_orgs()
+    """Yield (id, name, phones, website, addresses) rows through a server-side cursor.
+
+    Rows arrive ORG_LOAD_BATCH at a time, so the raw result set is never
+    held in memory all at once.
+    """
+    # The connection is rolled back on exit, which ends the named cursor's transaction
+    with READ_DB.connection() as conn:
+        with conn.cursor(name="existing_orgs") as cur:
+            cur.itersize = ORG_LOAD_BATCH
+            cur.execute("""
+                SELECT id, name, phones, website, addresses
+                FROM organizations
+            """)
+            yield from cur
 
 def extract_zip(address):
     match = re.search(r'\b\d{5}(?=\D*$)', address)
     return match.group(0) if match else None
+
+# ─────────────────────────────────────────────
+# 🧮 Batched Name Scoring
+# ─────────────────────────────────────────────
+MATCH_THRESHOLD = 85
+
+@lru_cache(maxsize=65536)
+def normalize_name(name):
+    # Same preprocessing fuzz.token_set_ratio applies, done once per distinct name
+    return fuzz_utils.full_process(name or "", force_ascii=True)
+
+def score_names(name, candidate_names):
+    """Score one name against N pre-normalized names with token_set_ratio.
+
+    Returns integer scores aligned with candidate_names, identical to calling
+    fuzz.token_set_ratio(name.lower(), candidate.lower()) pair by pair.
+    """
+    query = normalize_name(name)
+    if not query or not candidate_names:
+        return [0] * len(candidate_names)
+    if rf_process is None:
+        return [fuzz.token_set_ratio(query, cand, full_process=False) for cand in candidate_names]
+    scores = [0] * len(candidate_names)
+    for _, score, i in rf_process.extract(
+        query, candidate_names, scorer=rf_fuzz.token_set_ratio, processor=None, limit=None
+    ):
+        scores[i] = int(round(score))
+    return scores
+
+# ─────────────────────────────────────────────
+# 🗂️ In-Memory Organization Match Index
+# ─────────────────────────────────────────────
+# Name tokens too generic to narrow anything down on their own
+NAME_STOPWORDS = {"the", "and", "of", "inc", "llc", "co", "corp", "company", "ltd"}
+# Name-token blocks bigger than this are skipped (e.g. "garage", "door", "repair")
+MAX_NAME_BLOCK = 500
+# Geo cells are the size of the proximity radius used by match_existing_org
+GEO_CELL = 0.001
+
+def _json_value(value):
+    # Rows from the DB carry decoded jsonb, rows added during the run carry JSON strings
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+def normalize_phone_key(phone):
+    digits = re.sub(r'\D', '', str(phone or ""))
+    return digits[-10:] if len(digits) >= 10 else None
+
+def name_tokens(name):
+    return {
+        tok for tok in re.findall(r'[a-z0-9]+', (name or "").lower())
+        if len(tok) > 1 and tok not in NAME_STOPWORDS
+    }
+
+def _geo_cell(lat, lng):
+    return (int(lat // GEO_CELL), int(lng // GEO_CELL))
+
+def _as_list(value):
+    value = _json_value(value)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+class OrgRecord:
+    """One organization, reduced to the fields matching reads.
+
+    jsonb columns are parsed once: phones as strings, websites as their
+    domains, and the address, ZIP and coordinates pulled out of addresses.
+    """
+
+    __slots__ = ("id", "name", "phones", "domains", "address", "zip", "lat", "lng")
+
+    def __init__(self, org_id, name, phones=(), domains=(), address=None, zip_code=None, lat=None, lng=None):
+        self.id = org_id
+        self.name = name
+        self.phones = phones
+        self.domains = domains
+        self.address = address
+        self.zip = zip_code
+        self.lat = lat
+        self.lng = lng
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from an (id, name, phones, website, addresses) organizations row."""
+        org_id, name, phones, website, addresses = row
+        phones = tuple(str(p) for p in _as_list(phones) if p)
+        domains = tuple(dict.fromkeys(d for d in (extract_domain(w) for w in _as_list(website) if w) if d))
+        addresses = _json_value(addresses)
+        lat = lng = None
+        if isinstance(addresses, dict):
+            address = addresses.get("address")
+            zip_code = addresses.get("zip") or extract_zip(address or "")
+            try:
+                lat = float(addresses["latitude"])
+                lng = float(addresses["longitude"])
+            except (KeyError, TypeError, ValueError):
+                pass
+        else:
+            address = addresses if isinstance(addresses, str) else None
+            zip_code = extract_zip(address) if address else None
+        return cls(
+            org_id, name, phones, domains, address,
+            sys.intern(str(zip_code)) if zip_code else None, lat, lng,
+        )
+
+    def __repr__(self):
+        return f"OrgRecord({self.id!r}, {self.name!r})"
+
+class OrgIndex:
+    """Blocking index over OrgRecords.
+
+    Exact-key buckets (phone, website domain, ZIP, geo cell) plus name-token
+    blocks narrow every lookup to a handful of candidate rows, so fuzzy
+    scoring no longer runs against the whole organizations table.
+
+    `lock` guards the buckets, so browser threads can look up candidates
+    while the writer adds rows without either taking WRITE_LOCK.
+    """
+
+    def __init__(self, rows=()):
+        self.lock = threading.Lock()
+        self.rows = []  # OrgRecord per position
+        self.names = []  # normalize_name() of each row, aligned with rows
+        self.by_phone = {}
+        self.by_domain = {}
+        self.by_zip = {}
+        self.by_geo = {}
+        self.by_token = {}
+        for row in rows:
+            self.add(OrgRecord.from_row(row))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, org):
+        """Index an OrgRecord, e.g. one inserted by upsert_organization during the run."""
+        with self.lock:
+            self.rows.append(org)
+            self._index(len(self.rows) - 1, org)
+
+    def _index(self, pos, org):
+        self.names.append(normalize_name.__wrapped__(org.name))
+        for phone in org.phones:
+            key = normalize_phone_key(phone)
+            if key:
+                self.by_phone.setdefault(key, []).append(pos)
+        for domain in org.domains:
+            self.by_domain.setdefault(domain, []).append(pos)
+        if org.lat is not None and org.lng is not None:
+            self.by_geo.setdefault(_geo_cell(org.lat, org.lng), []).append(pos)
+        if org.zip:
+            self.by_zip.setdefault(org.zip, []).append(pos)
+        for tok in name_tokens(org.name):
+            self.by_token.setdefault(tok, []).append(pos)
+
+    def candidates(self, name, phone=None, website=None, address=None, lat=None, lng=None):
+        """Row positions sharing at least one blocking key, in table order."""
+        found = set()
+        key = normalize_phone_key(phone)
+        if key:
+            found.update(self.by_phone.get(key, ()))
+        domain = extract_domain(website) if website else None
+        if domain:
+            found.update(self.by_domain.get(domain, ()))
+        zip_code = extract_zip(address) if address else None
+        if zip_code:
+            found.update(self.by_zip.get(zip_code, ()))
+        if lat and lng:
+            row, col = _geo_cell(lat, lng)
+            for d_row in (-1, 0, 1):
+                for d_col in (-1, 0, 1):
+                    found.update(self.by_geo.get((row + d_row, col + d_col), ()))
+        for tok in name_tokens(name):
+            block = self.by_token.get(tok, ())
+            if len(block) <= MAX_NAME_BLOCK:
+                found.update(block)
+        return sorted(found)
+
+# "memory" loads every org at startup and matches against ORG_INDEX.
+# "db" leaves the table in PostgreSQL and asks READ_DB for candidates
+# (see match_existing_org_db); ORG_INDEX then only holds orgs inserted this run.
+ORG_MATCH_MODE = os.getenv("ORG_MATCH_MODE", "memory")
+ORG_MATCH_MODES = ("memory", "db")
+
+# Filled from the organizations table by init_scraper()
+ORG_INDEX = OrgIndex()
+ORG_INDEX_LOADED = False
+
+def org_row(org_id, data):
+    # OrgRecord for an org inserted during the run, built from its scraped_data
+    return OrgRecord.from_row((
+        org_id, data["Name"], [data["Phone"]] if data["Phone"] else [],
+        [data["Website"]] if data["Website"] else [],
+        {"address": data["Address"], "zip": data.get("ZIP", "")},
+    ))
+
 # ─────────────────────────────────────────────
 # Deduplication & Fuzzy Organization Matching
 # ─────────────────────────────────────────────
-def match_existing_org(name, phone, website, address, lat=None, lng=None):
-    for org in EXISTING_ORGS:
-        org_id, org_name, org_phones, org_website, org_addresses = org
-        score = fuzz.token_set_ratio(name.lower(), (org_name or "").lower())
-        
-        if score >= 85:
-            # Direct match on phone
-            if phone and org_phones and phone in org_phones:
-                return org
-            # Domain match
-            if website and org_website:
-                if extract_domain(website) == extract_domain(org_website):
-                    return org
-            # Address match
-            if address and org_addresses and address in org_addresses:
+def _confirms_match(org, phone, website, address, lat=None, lng=None):
+    # Direct match on phone
+    if phone and phone in org.phones:
+        return True
+    # Domain match
+    if website and org.domains and extract_domain(website) in org.domains:
+        return True
+    # Address match
+    if address and org.address and address == org.address:
+        return True
+    # Geolocation proximity check (simple ~0.001 degree radius)
+    if lat and lng and org.lat is not None and org.lng is not None:
+        if abs(org.lat - lat) <= 0.001 and abs(org.lng - lng) <= 0.001:
+            return True
+    return False
+
+def _best_match(name, phone, website, address, lat=None, lng=None, index=None):
+    index = ORG_INDEX if index is None else index
+    # rows and names are append-only, so positions stay valid once the lock
+    # is released and scoring runs outside it
+    with index.lock:
+        positions = index.candidates(name, phone, website, address, lat, lng)
+        names = [index.names[pos] for pos in positions]
+    scores = score_names(name, names)
+    for pos, score in zip(positions, scores):
+        if score >= MATCH_THRESHOLD:
+            org = index.rows[pos]
+            if _confirms_match(org, phone, website, address, lat, lng):
                 return org
-            # Geolocation proximity check (simple ~0.001 degree radius)
-            if lat and lng and isinstance(org_addresses, dict):
-                try:
-                    org_lat = float(org_addresses.get('latitude', 0))
-                    org_lng = float(org_addresses.get('longitude', 0))
-                    if abs(org_lat - lat) <= 0.001 and abs(org_lng - lng) <= 0.001:
-                        return org
-                except:
-                    pass
     return None
 
-# Helper to check if org data has changed
-def org_data_changed(existing, scraped):
-    _, org_name, org_phones, org_website, org_addresses = existing
-    addr = org_addresses.get('address') if isinstance(org_addresses, dict) else org_addresses
-    return (
-        scraped["Name"].lower() != (org_name or "").lower() or
-        (scraped["Phone"] and scraped["Phone"] not in (org_phones or "")) or
-        (scraped["Website"] and extract_domain(scraped["Website"]) != extract_domain(org_website)) or
-        (scraped["Address"] and scraped["Address"] != (addr or ""))
+def match_existing_org(name, phone, website, address, lat=None, lng=None):
+    if ORG_MATCH_MODE == "db":
+        return match_existing_org_db(name, phone, website, address, lat, lng)
+    return _best_match(name, phone, website, address, lat, lng)
+
+# ─────────────────────────────────────────────
+# 🌐 DB-Side Candidate Retrieval (ORG_MATCH_MODE=db)
+# ─────────────────────────────────────────────
+# Needs the indexes in sql/org_match_indexes.sql on the read database.
+# ST_DWithin radius covers the corners of the 0.001 degree proximity box
+GEO_SEARCH_RADIUS = 0.0015
+NAME_TRGM_LIMIT = 20
+
+ORG_CANDIDATES_SQL = """
+    WITH probe AS (
+        SELECT ST_SetSRID(ST_MakePoint(%(lng)s::double precision, %(lat)s::double precision), 4326) AS pt
+    ),
+    candidate_ids AS (
+        SELECT id FROM organizations
+        WHERE ST_DWithin(geom_m, (SELECT pt FROM probe), %(radius)s)
+        UNION
+        SELECT id FROM organizations WHERE phones ? %(phone)s
+        UNION
+        SELECT id FROM organizations WHERE website_domain = %(domain)s
+        UNION
+        SELECT id FROM organizations WHERE addresses->>'address' = %(address)s
+        UNION
+        (
+            SELECT id FROM organizations
+            WHERE lower(name) %% lower(%(name)s)
+            ORDER BY similarity(lower(name), lower(%(name)s)) DESC
+            LIMIT %(trgm_limit)s
+        )
     )
+    SELECT o.id, o.name, o.phones, o.website, o.addresses,
+           COALESCE(
+               abs(ST_Y(o.geom_m) - %(lat)s::double precision) <= 0.001
+               AND abs(ST_X(o.geom_m) - %(lng)s::double precision) <= 0.001,
+               false
+           ) AS near
+    FROM organizations o
+    JOIN candidate_ids c ON c.id = o.id
+    ORDER BY o.id
+"""
+
+def fetch_org_candidates(name, phone, website, address, lat=None, lng=None):
+    return READ_DB.fetchall(ORG_CANDIDATES_SQL, {
+        "name": name,
+        "phone": phone or None,
+        "domain": extract_domain(website) if website else None,
+        "address": address or None,
+        "lat": lat,
+        "lng": lng,
+        "radius": GEO_SEARCH_RADIUS,
+        "trgm_limit": NAME_TRGM_LIMIT,
+    })
+
+def match_existing_org_db(name, phone, website, address, lat=None, lng=None):
+    """Match against candidates retrieved by PostGIS/pg_trgm instead of ORG_INDEX.
+
+    Only the few rows sharing a phone, domain, address, nearby geom_m or a
+    similar name come back; the final fuzzy check runs here in Python.
+    Orgs inserted earlier in this run are still matched through ORG_INDEX.
+    """
+    rows = fetch_org_candidates(name, phone, website, address, lat, lng)
+    scores = score_names(name, [normalize_name(row[1]) for row in rows])
+    for row, score in zip(rows, scores):
+        if score >= MATCH_THRESHOLD:
+            org, near = OrgRecord.from_row(row[:5]), row[5]
+            if near or _confirms_match(org, phone, website, address, lat, lng):
+                return org
+    return _best_match(name, phone, website, address, lat, lng)
 
 # ─────────────────────────────────────────────
 # Database Insert Helpers
 # ─────────────────────────────────────────────
-def insert_organization(data):
+# organizations columns written from scraped_data, with the SQL each
+# _org_columns() value goes through. The upserts need the unique google_id
+# index in sql/org_google_id_unique.sql.
+ORG_COLUMNS = [
+    ("name", "%(name)s"),
+    ("name_raw", "%(name_raw)s"),
+    ("slug", "%(slug)s"),
+    ("phones", "%(phones)s::jsonb"),
+    ("website", "%(website)s::jsonb"),
+    ("addresses", "%(addresses)s::jsonb"),
+    ("google_rating", "%(rating)s::double precision"),
+    ("review_count", "%(review_count)s::integer"),
+    ("avg_rating", "%(rating)s::double precision"),
+    ("source_ids", "%(source_ids)s::jsonb"),
+    ("ids", "%(ids)s::jsonb"),
+    ("hours", "%(hours)s::jsonb"),
+    ("google_id", "%(google_id)s"),
+    ("review_excerpt", "%(review_excerpt)s"),
+    ("canonical_abbr", "%(canonical_abbr)s"),
+    ("geom_m", "ST_SetSRID(ST_MakePoint(%(lng)s, %(lat)s), 4326)"),
+    ("google_place_url", "%(google_place_url)s"),
+    ("website_domain", "%(website_domain)s"),
+    ("source", "%(source)s"),
+    ("content_hash", "%(content_hash)s"),
+]
+# google_id is the upsert key, and a matched org keeps the one it has
+ORG_UPDATE_COLUMNS = [col for col, _ in ORG_COLUMNS if col != "google_id"]
+
+# Left out of the org hash because it differs between scrapes of an unchanged
+# place: the share short link (or the session URL when the dialog fails)
+ORG_HASH_EXCLUDED = ("google_place_url",)
+
+def content_hash(values):
+    """sha1 of values as canonical JSON; what the content_hash columns store."""
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _org_columns(data):
+    """Values for ORG_COLUMNS from scraped_data, keyed by placeholder name."""
+    columns = {
+        "name": data["Name"],
+        "name_raw": data.get("Name Raw"),
+        "slug": data.get("Slug"),
+        "phones": json.dumps([data["Phone"]] if data.get("Phone") else []),
+        "website": json.dumps([data["Website"]] if data.get("Website") else []),
+        "addresses": json.dumps({"address": data.get("Address"), "zip": data.get("ZIP", "")}),
+        "rating": float(data["Rating"]) if data.get("Rating") else None,
+        "review_count": int(data["review_count"]) if data.get("review_count") else None,
+        "source_ids": json.dumps({"google_place_id": data.get("Place ID")}),
+        "ids": json.dumps({"external": data.get("Place ID")}),
+        "hours": json.dumps({"hours_text": data["Hours"] if data.get("Hours") else "Unavailable"}),
+        # "" would make every listing without a place ID conflict with each other
+        "google_id": data.get("Place ID") or None,
+        "review_excerpt": data.get("review_excerpt"),
+        "canonical_abbr": data.get("canonical_abbr") or "",
+        "lng": float(data["Longitude"]) if data.get("Longitude") else None,
+        "lat": float(data["Latitude"]) if data.get("Latitude") else None,
+        "google_place_url": data.get("Google Place URL"),
+        "website_domain": data.get("Website Domain"),
+        "source": data.get("Source"),
+    }
+    columns["content_hash"] = content_hash(
+        {name: value for name, value in columns.items() if name not in ORG_HASH_EXCLUDED}
+    )
+    return columns
+
+def org_content_hash(data):
+    return _org_columns(data)["content_hash"]
+
+def _org_upsert_sql(values, update_values, update_source, insert_source):
+    """updated/upserted CTEs shared by the single and batched org upserts.
+
+    values and update_values are the SQL for ORG_COLUMNS and for
+    ORG_UPDATE_COLUMNS; update_source and insert_source are the FROM
+    clauses the UPDATE and the INSERT read them from. A matched org is
+    updated by id when it exists on the write database; otherwise the row
+    is inserted, or merged into the org that already has its google_id.
+    Either way, a row whose stored content_hash matches is left untouched.
+    """
+    update_cols = ", ".join(ORG_UPDATE_COLUMNS)
+    update_vals = ", ".join(update_values)
+    new_hash = update_values[ORG_UPDATE_COLUMNS.index("content_hash")]
+    return f"""
+        updated AS (
+            UPDATE organizations o SET ({update_cols}) = ({update_vals})
+            FROM {update_source}
+            WHERE o.id = matched.id
+              AND o.content_hash IS DISTINCT FROM {new_hash}
+            RETURNING matched.ord, o.id
+        ),
+        upserted AS (
+            INSERT INTO organizations ({", ".join(col for col, _ in ORG_COLUMNS)})
+            SELECT {", ".join(values)} {insert_source}
+            ON CONFLICT (google_id) DO UPDATE SET ({update_cols}) = (
+                {", ".join("EXCLUDED." + col for col in ORG_UPDATE_COLUMNS)}
+            )
+            WHERE organizations.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            RETURNING id, google_id, xmax = 0 AS fresh
+        )
+    """
+
+UPSERT_ORG_SQL = f"""
+    WITH matched AS (
+        SELECT 0 AS ord, id FROM organizations WHERE id = %(match_id)s
+    ),
+    {_org_upsert_sql(
+        [sql for _, sql in ORG_COLUMNS],
+        [sql for col, sql in ORG_COLUMNS if col != "google_id"],
+        "matched",
+        "WHERE NOT EXISTS (SELECT 1 FROM matched)",
+    )}
+    SELECT id, 'updated' FROM updated
+    UNION ALL
+    SELECT id, 'no_update' FROM matched WHERE NOT EXISTS (SELECT 1 FROM updated)
+    UNION ALL
+    SELECT id, CASE WHEN fresh THEN 'inserted' ELSE 'updated' END FROM upserted
+    UNION ALL
+    SELECT id, 'no_update' FROM organizations
+    WHERE google_id = %(google_id)s
+      AND NOT EXISTS (SELECT 1 FROM matched) AND NOT EXISTS (SELECT 1 FROM upserted)
+"""
+
+@lru_cache(maxsize=None)
+def org_id_type():
+    # organizations.id as SQL, so an all-NULL match_id column in VALUES still compares with it
+    return WRITE_DB.fetchone("""
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = 'organizations'::regclass AND attname = 'id'
+    """)[0]
+
+def org_batch_template():
+    """One VALUES row per listing for execute_values: its position, the matched org id, then ORG_COLUMNS."""
+    return (f"(%(ord)s, CAST(%(match_id)s AS {org_id_type()}), "
+            + ", ".join(sql for _, sql in ORG_COLUMNS) + ")")
+
+UPSERT_ORGS_SQL = f"""
+    WITH data (ord, match_id, {", ".join(col for col, _ in ORG_COLUMNS)}) AS (
+        VALUES %s
+    ),
+    matched AS (
+        SELECT d.ord, o.id FROM data d JOIN organizations o ON o.id = d.match_id
+    ),
+    {_org_upsert_sql(
+        ["d." + col for col, _ in ORG_COLUMNS],
+        ["d." + col for col in ORG_UPDATE_COLUMNS],
+        "matched JOIN data d ON d.ord = matched.ord",
+        "FROM data d WHERE d.ord NOT IN (SELECT ord FROM matched) ORDER BY d.ord",
+    )}
+    SELECT ord, id, 'updated' FROM updated
+    UNION ALL
+    SELECT ord, id, 'no_update' FROM matched WHERE ord NOT IN (SELECT ord FROM updated)
+    UNION ALL
+    SELECT d.ord, u.id, CASE WHEN u.fresh THEN 'inserted' ELSE 'updated' END
+    FROM data d JOIN upserted u ON u.google_id = d.google_id
+    UNION ALL
+    SELECT d.ord, o.id, 'no_update'
+    FROM data d JOIN organizations o ON o.google_id = d.google_id
+    WHERE d.ord NOT IN (SELECT ord FROM matched) AND d.google_id NOT IN (SELECT google_id FROM upserted)
+"""
+
+def upsert_organization(data, match_id=None):
+    """Write one org in a single statement (see _org_upsert_sql).
+
+    Returns (org_id, db_action) with db_action "inserted", "updated" or
+    "no_update", or (None, None) when the write failed.
+    """
     try:
-        with WRITE_CONN.cursor() as cur:
-            cur.execute("""
-                INSERT INTO organizations (
-                    name, name_raw, slug, phones, website, addresses,
-                    google_rating, review_count, avg_rating,
-                    source_ids, ids, hours,
-                    google_id, review_excerpt, canonical_abbr,
-                    geom_m, google_place_url, website_domain, source
-                )
-                VALUES (
-                    %s, %s, %s,
-                    %s::jsonb, %s::jsonb, %s::jsonb,
-                    %s::double precision, %s::integer, %s::double precision,
-                    %s::jsonb, %s::jsonb, %s::jsonb,
-                    %s, %s, %s,
-                    ST_SetSRID(ST_MakePoint(%s, %s), 4326), %s, %s, %s
-                )
-                RETURNING id;
-            """, (
-                data["Name"],
-                data["Name Raw"],
-                data["Slug"],
-                json.dumps([data["Phone"]]) if data["Phone"] else json.dumps([]),
-                json.dumps([data["Website"]]) if data["Website"] else json.dumps([]),
-                json.dumps({"address": data["Address"], "zip": data.get("ZIP", "")}),
-                float(data["Rating"]) if data.get("Rating") else None,
-                int(data["review_count"]) if data.get("review_count") else None,
-                float(data["Rating"]) if data.get("Rating") else None,
-                json.dumps({"google_place_id": data["Place ID"]}),
-                json.dumps({"external": data["Place ID"]}),
-                json.dumps({"hours_text": data["Hours"]}) if data.get("Hours") else json.dumps({"hours_text": "Unavailable"}),
-                data.get("Place ID"),
-                data.get("review_excerpt"),
-                data.get("canonical_abbr") or "",
-                float(data["Longitude"]) if data.get("Longitude") else None,
-                float(data["Latitude"]) if data.get("Latitude") else None,
-                data.get("Google Place URL"),
-                data.get("Website Domain"),
-                data.get("Source")
-            ))
-            WRITE_CONN.commit()
-            return cur.fetchone()[0]
+        org_id, db_action = WRITE_DB.fetchone(UPSERT_ORG_SQL, {**_org_columns(data), "match_id": match_id})
+        return org_id, db_action
     except Exception as e:
-        print(f"DB Insert Error: {e}")
-        WRITE_CONN.rollback()
-        return None
+        print(f"DB Upsert Error: {e}")
+        return None, None
+
+def upsert_organizations(listings, match_ids):
+    """upsert_organization for a whole batch, in one round trip.
+
+    The batch statement matches its results back through google_id, so
+    listings without one, or repeating one already in the batch, are
+    written one by one afterwards. Returns (org_id, db_action) per listing.
+    """
+    results = [(None, None)] * len(listings)
+    rows, batched_ids, single = [], set(), []
+    for i, (data, match_id) in enumerate(zip(listings, match_ids)):
+        row = {**_org_columns(data), "ord": i, "match_id": match_id}
+        if row["google_id"] and row["google_id"] not in batched_ids:
+            batched_ids.add(row["google_id"])
+            rows.append(row)
+        else:
+            single.append(i)
+    if rows:
+        try:
+            # Built first: org_id_type() may need its own connection, and the
+            # pool blocks a second checkout once it is down to its last one
+            template = org_batch_template()
+            returned = WRITE_DB.run(lambda cur: execute_values(
+                cur, UPSERT_ORGS_SQL, rows, template=template, page_size=len(rows), fetch=True
+            ))
+            for ord_, org_id, db_action in returned:
+                results[ord_] = (org_id, db_action)
+        except Exception as e:
+            print(f"DB Batch Upsert Error: {e}, retrying {len(rows)} orgs one by one")
+            single = sorted(single + [row["ord"] for row in rows])
+    for i in single:
+        results[i] = upsert_organization(listings[i], match_ids[i])
+    return results
+
+# Reviews can be edited, so a stored review whose content_hash differs is rewritten
+REVIEW_UPSERT_SQL = """
+    INSERT INTO reviews (reviewer, rating, review, source, org_id, source_id, content_hash)
+    VALUES %s
+    ON CONFLICT (source_id) DO UPDATE SET
+        reviewer = EXCLUDED.reviewer,
+        rating = EXCLUDED.rating,
+        review = EXCLUDED.review,
+        content_hash = EXCLUDED.content_hash
+    WHERE reviews.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+    RETURNING xmax = 0 AS fresh
+"""
+
+def review_content_hash(review_data):
+    # The scraped date is relative ("a week ago"), so it is left out
+    return content_hash([review_data["reviewer"], review_data["rating"], review_data["review"]])
+
+def _review_row(review_data, org_id):
+    return (
+        review_data["reviewer"],
+        review_data["rating"],
+        review_data["review"],
+        "google_maps",
+        org_id,
+        review_data["source_id"],
+        review_content_hash(review_data),
+    )
+
+def _upsert_review_rows(rows):
+    """Write rows in one statement; returns "inserted" or "updated" for each row actually written."""
+    returned = WRITE_DB.run(lambda cur: execute_values(
+        cur, REVIEW_UPSERT_SQL, rows, page_size=len(rows), fetch=True
+    ))
+    return ["inserted" if fresh else "updated" for (fresh,) in returned]
 
 def insert_review(review_data, org_id):
+    """Upsert one review; returns "inserted", "updated", "no_update", or None when the write failed."""
     try:
-        with WRITE_CONN.cursor() as cur:
-            cur.execute("""
-                INSERT INTO reviews (reviewer, rating, review, source, org_id, source_id)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (source_id) DO NOTHING;
-            """, (
-                review_data["reviewer"],
-                review_data["rating"],
-                review_data["review"],
-                "google_maps",
-                org_id,
-                review_data["source_id"]
-            ))
-            WRITE_CONN.commit()
+        written = _upsert_review_rows([_review_row(review_data, org_id)])
+        return written[0] if written else "no_update"
     except Exception as e:
         print(f"DB Review Insert Error: {e}")
-        WRITE_CONN.rollback()
+        return None
+
+# ─────────────────────────────────────────────
+# 📦 Batched Review Writer
+# ─────────────────────────────────────────────
+REVIEW_BATCH_SIZE = int(os.getenv("GOOGLE_REVIEW_BATCH_SIZE", "500"))
+REVIEW_FLUSH_SECONDS = float(os.getenv("GOOGLE_REVIEW_FLUSH_SECONDS", "10"))
+
+class ReviewSink:
+    """Buffers reviews and writes them with one multi-row upsert per flush.
+
+    Same REVIEW_UPSERT_SQL as insert_review. A flush happens once max_rows
+    reviews are buffered or the oldest buffered review is max_age seconds
+    old (checked on add() and by the write-behind writer between jobs);
+    call flush() at the end of a query. An on_flushed() callback is dropped
+    if any review of its org failed in any flush this run, including
+    size-triggered flushes that ran before the callback was registered.
+    """
+
+    def __init__(self, max_rows=REVIEW_BATCH_SIZE, max_age=REVIEW_FLUSH_SECONDS):
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.rows = []
+        self.first_at = None
+        self.callbacks = []
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.failed_orgs = set()  # org ids with a review that was not written
+
+    def add(self, review_data, org_id):
+        with WRITE_LOCK:
+            if not self.rows:
+                self.first_at = time.time()
+            self.rows.append(_review_row(review_data, org_id))
+            if len(self.rows) >= self.max_rows or time.time() - self.first_at >= self.max_age:
+                self.flush()
+
+    def add_many(self, reviews, org_id):
+        for review_data in reviews:
+            self.add(review_data, org_id)
+
+    def on_flushed(self, callback, org_id=None):
+        """Run callback once everything buffered so far is written, unless a review of org_id failed."""
+        with WRITE_LOCK:
+            if org_id in self.failed_orgs:
+                return
+            if self.rows:
+                self.callbacks.append((org_id, callback))
+                return
+        callback()
+
+    def flush(self):
+        with WRITE_LOCK:
+            rows, self.rows = self.rows, []
+            callbacks, self.callbacks = self.callbacks, []
+            if rows:
+                flush_start = time.time()
+                # DO UPDATE may not touch a row twice in one statement, so the last copy of a
+                # source_id wins; reviews without one never conflict and are all kept
+                unique = [r for r in rows if r[5] is None]
+                unique += {r[5]: r for r in rows if r[5] is not None}.values()
+                try:
+                    actions = _upsert_review_rows(unique)
+                except Exception as e:
+                    print(f"DB Review Batch Insert Error: {e}, retrying {len(unique)} reviews one by one")
+                    actions = [
+                        insert_review(
+                            {"reviewer": r[0], "rating": r[1], "review": r[2], "source_id": r[5]}, r[4]
+                        )
+                        for r in unique
+                    ]
+                inserted, updated, failed = actions.count("inserted"), actions.count("updated"), actions.count(None)
+                if failed:
+                    # Only the one-by-one retry yields None, and it returns an action per row
+                    self.failed_orgs.update(r[4] for r, action in zip(unique, actions) if action is None)
+                unchanged = len(rows) - inserted - updated - failed
+                self.inserted += inserted
+                self.updated += updated
+                self.unchanged += unchanged
+                self.failed += failed
+                METRICS.inc("reviews_new", inserted)
+                METRICS.inc("reviews_changed", updated)
+                METRICS.inc("reviews_unchanged", unchanged)
+                METRICS.observe("review_flush", time.time() - flush_start)
+            # Their listings stay unjournaled and get scraped again
+            dropped = [cb for org_id, cb in callbacks if org_id in self.failed_orgs]
+            if dropped:
+                print(f"Reviews of {len(dropped)} listings were not all written; not marking them done")
+            callbacks = [cb for org_id, cb in callbacks if org_id not in self.failed_orgs]
+        for callback in callbacks:
+            callback()
+
+    def flush_due(self):
+        """Flush if the oldest buffered review has waited max_age; the writer calls this between jobs."""
+        with WRITE_LOCK:
+            if self.rows and time.time() - self.first_at >= self.max_age:
+                self.flush()
+
+    def report(self):
+        return (f"Reviews written: {self.inserted} new | {self.updated} changed | "
+                f"{self.unchanged} unchanged | {self.failed} failed")
+
+REVIEW_SINK = ReviewSink()
 
 # ─────────────────────────────────────────────
 # ⏰ Extract Business Hours
 # ─────────────────────────────────────────────
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+HOURS_PARENS_RE = re.compile(r'\(.*?\)')
+HOURS_HOLIDAY_RE = re.compile(r'(Holiday hours|Hours might differ|Independence Day|Christmas|New Year\'?s Day|Labor Day|Easter|Thanksgiving).*', re.IGNORECASE)
+MULTISPACE_RE = re.compile(r'\s{2,}')
+
+def clean_hours_text(hour_text):
+    # Remove parentheses and holidays
+    hour_text = HOURS_PARENS_RE.sub('', hour_text)  # Remove parentheses like (Independence Day)
+    hour_text = HOURS_HOLIDAY_RE.sub('', hour_text)
+    hour_text = hour_text.replace('\u202f', ' ').strip()  # Normalize non-breaking spaces
+    return MULTISPACE_RE.sub(' ', hour_text)
+
+def hours_json(rows):
+    """JSON hours from (day, hours text) rows of the hours table."""
+    hours_dict = {day: "Closed" for day in DAY_ORDER}
+    for day, hour_text in rows:
+        hour_text = clean_hours_text(hour_text.strip())
+        day = day.strip()
+        if day in hours_dict and hour_text:
+            hours_dict[day] = hour_text
+    return json.dumps(hours_dict)
+
 def extract_hours(driver):
     try:
-        day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        hours_dict = {day: "Closed" for day in day_order}
-
         hours_container = driver.find_element(By.CSS_SELECTOR, "div.OqCZI.WVXvdc")
         dropdown_btn = hours_container.find_element(By.CSS_SELECTOR, "div.OMl5r")
         if dropdown_btn.get_attribute("aria-expanded") == "false":
             dropdown_btn.click()
-            time.sleep(0.5)
+            wait_until(
+                driver, lambda d: hours_container.find_elements(By.CSS_SELECTOR, "div.t39EBf table.eK4R0e tr"),
+                "hours_expand"
+            )
 
         table = hours_container.find_element(By.CSS_SELECTOR, "div.t39EBf table.eK4R0e")
         rows = table.find_elements(By.TAG_NAME, "tr")
 
-        for row in rows:
-            day = row.find_element(By.CSS_SELECTOR, 'td.ylH6lf').text.strip()
-            hour_text = row.find_element(By.CSS_SELECTOR, 'td.mxowUb').text.strip()
-
-            # Remove parentheses and holidays
-            hour_text = re.sub(r'\(.*?\)', '', hour_text)  # Remove parentheses like (Independence Day)
-            hour_text = re.sub(r'(Holiday hours|Hours might differ|Independence Day|Christmas|New Year\'?s Day|Labor Day|Easter|Thanksgiving).*', '', hour_text, flags=re.IGNORECASE)
-            hour_text = hour_text.replace('\u202f', ' ').strip()  # Normalize non-breaking spaces
-            hour_text = re.sub(r'\s{2,}', ' ', hour_text)
-
-            if day in hours_dict and hour_text:
-                hours_dict[day] = hour_text
-
-        return json.dumps(hours_dict)
+        return hours_json(
+            (row.find_element(By.CSS_SELECTOR, 'td.ylH6lf').text, row.find_element(By.CSS_SELECTOR, 'td.mxowUb').text)
+            for row in rows
+        )
     except Exception:
         print("Hours not available for this listing.")
         return "Unavailable"
@@ -262,15 +1298,74 @@ def extract_review_count(driver):
         pass
     return None
 
+# ─────────────────────────────────────────────
+# 🔄 Incremental Review Sync
+# ─────────────────────────────────────────────
+# GOOGLE_INCREMENTAL_REVIEWS=1 sorts reviews newest first for orgs we already
+# have and stops scrolling at the first page made up of stored reviews
+INCREMENTAL_REVIEWS = os.getenv("GOOGLE_INCREMENTAL_REVIEWS", "0") == "1"
+
+REVIEW_IDS_JS = """
+return Array.from(document.querySelectorAll('div.jftiEf.fontBodyMedium'))
+    .slice(arguments[0]).map(function (card) { return card.getAttribute('data-review-id'); });
+"""
+REVIEW_SORT_NEWEST_JS = """
+var items = Array.from(document.querySelectorAll('div[role="menuitemradio"]'));
+var newest = items.find(function (item) { return /newest/i.test(item.textContent); })
+    || document.querySelector('div[role="menuitemradio"][data-index="1"]');
+if (!newest) { return false; }
+newest.click();
+return true;
+"""
+
+def known_review_ids(org_id):
+    """source_ids of the Google reviews already stored for org_id."""
+    try:
+        rows = WRITE_DB.fetchall(
+            "SELECT source_id FROM reviews WHERE org_id = %s AND source = 'google_maps'", (org_id,)
+        )
+    except Exception as e:
+        print(f"Failed to load stored reviews for org {org_id}: {e}")
+        return set()
+    return {row[0] for row in rows}
+
+def sort_reviews_newest(driver):
+    """Switch the open Reviews tab to newest first; returns False if the sort menu is missing."""
+    try:
+        first = driver.execute_script(REVIEW_IDS_JS, 0)[:1]
+        sort_btn = driver.find_element(By.CSS_SELECTOR, 'button[aria-label="Sort reviews"], button[data-value="Sort"]')
+        driver.execute_script("arguments[0].click();", sort_btn)
+        if not wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, 'div[role="menuitemradio"]')), "review_sort"):
+            return False
+        if not driver.execute_script(REVIEW_SORT_NEWEST_JS):
+            return False
+        # The list is replaced in place; wait for a different first card
+        wait_until(driver, lambda d: (d.execute_script(REVIEW_IDS_JS, 0)[:1] or first) != first, "review_sort")
+        return True
+    except Exception as e:
+        print(f"Could not sort reviews by newest: {e}")
+        return False
+
+def page_is_known(driver, start, known_ids):
+    """True when every review card from index start on is already in known_ids."""
+    page = [i for i in driver.execute_script(REVIEW_IDS_JS, start) if i]
+    return bool(page) and all(i in known_ids for i in page)
+
 # ─────────────────────────────────────────────
 # 📊 Extract All Reviews for a Business
 # ─────────────────────────────────────────────
-def safe_scroll_reviews(driver):
+def safe_scroll_reviews(driver, known_ids=None, on_chunk=None):
+    """Open the Reviews tab and scroll until every review is loaded.
+
+    With known_ids (stored source_ids for this org), reviews are sorted
+    newest first and scrolling stops at the first page of known reviews.
+    With on_chunk, every REVIEW_WINDOW loaded reviews are extracted, passed
+    to on_chunk and removed from the page while scrolling continues.
+    """
     print(f"Scrolling reviews for: {driver.current_url}")
     print("Starting review scroll attempts...")
     try:
         dismiss_overlay(driver)
-        time.sleep(0.5)
     except Exception as e:
         print(f"Overlay dismiss failed: {e}")
 
@@ -279,7 +1374,6 @@ def safe_scroll_reviews(driver):
         for tab in tabs:
             if "Reviews for" in tab.get_attribute("aria-label"):
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tab)
-                time.sleep(0.5)
                 for attempt in range(3):
                     try:
                         WebDriverWait(driver, 5).until(
@@ -300,11 +1394,16 @@ def safe_scroll_reviews(driver):
             EC.presence_of_element_located((By.CSS_SELECTOR, 'div.PPCwl'))
         )
         print("Clicked 'Reviews' tab, confirming active state...")
-        time.sleep(1)
+        wait_until(
+            driver, EC.presence_of_element_located((By.CSS_SELECTOR, 'button.hh2c6[aria-selected="true"][aria-label*="Reviews for"]')),
+            "reviews_tab"
+        )
         active_tab = driver.find_element(By.CSS_SELECTOR, 'button.hh2c6[aria-selected="true"]')
         if "Reviews for" in active_tab.get_attribute("aria-label"):
             print("✅ Reviews tab is active")
-            time.sleep(1)
+            wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, 'div.jftiEf.fontBodyMedium')), "reviews_load")
+            if known_ids and not sort_reviews_newest(driver):
+                known_ids = None  # not newest first, so stored reviews say nothing about the rest
 
             # REVISED SCROLL LOGIC:
             try:
@@ -323,35 +1422,48 @@ def safe_scroll_reviews(driver):
                 expected_count = extract_review_count(driver)
                 print(f"Total expected reviews: {expected_count}")
 
-                prev_count = 0
                 max_attempts = 100
-                scroll_pause = 1.5
+                loaded = prev_count = count_elements(driver, 'div.jftiEf.fontBodyMedium')
+                checked = 0
+                pruned = 0  # cards already streamed out and removed from the page
 
                 for i in range(max_attempts):
+                    if expected_count and pruned + loaded >= expected_count:
+                        print("Loaded all expected reviews, stopping scroll")
+                        break
+                    if known_ids and loaded > checked:
+                        if page_is_known(driver, checked, known_ids):
+                            print(f"Reached already-stored reviews after {pruned + loaded}, stopping scroll")
+                            break
+                        checked = loaded
+
                     driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable)
-                    time.sleep(scroll_pause)
+                    loaded = wait_until(
+                        driver, count_grows('div.jftiEf.fontBodyMedium', prev_count), "review_scroll"
+                    ) or prev_count
 
-                    reviews_now = driver.find_elements(By.CSS_SELECTOR, 'div.jftiEf.fontBodyMedium')
                     # Only print every 5 scrolls or if we've loaded all expected
-                    if (i + 1) % 5 == 0 or (expected_count and len(reviews_now) >= expected_count):
-                        print(f"Scrolled {i+1} times, loaded {len(reviews_now)}/{expected_count} reviews...")
+                    if (i + 1) % 5 == 0 or (expected_count and pruned + loaded >= expected_count):
+                        print(f"Scrolled {i+1} times, loaded {pruned + loaded}/{expected_count} reviews...")
 
-                    if expected_count and len(reviews_now) >= expected_count:
-                        print("Loaded all expected reviews, stopping scroll")
-                        break
-
-                    if len(reviews_now) == prev_count:
+                    if loaded == prev_count:
                         print("No more reviews loaded, stopping scroll")
                         break
 
-                    prev_count = len(reviews_now)
+                    if on_chunk and loaded >= REVIEW_WINDOW + REVIEW_WINDOW_KEEP:
+                        removed = drain_review_window(driver, on_chunk)
+                        pruned += removed
+                        loaded -= removed
+                        checked = max(0, checked - removed)
 
-                if expected_count and len(reviews_now) < expected_count:
-                    print(f"⚠️ Only loaded {len(reviews_now)} out of {expected_count} expected reviews, possible limitation")
+                    prev_count = loaded
+
+                if expected_count and pruned + loaded < expected_count:
+                    print(f"⚠️ Only loaded {pruned + loaded} out of {expected_count} expected reviews, possible limitation")
                 else:
-                    print(f"✅ Loaded {len(reviews_now)} reviews successfully")
+                    print(f"✅ Loaded {pruned + loaded} reviews successfully")
                 # Print summary after scrolls
-                print(f"Total expected: {expected_count} | Total loaded: {len(reviews_now)}")
+                print(f"Total expected: {expected_count} | Total loaded: {pruned + loaded}")
                 return True
             except Exception as e:
                 print(f"Failed during review scroll: {e}")
@@ -364,50 +1476,616 @@ def safe_scroll_reviews(driver):
         return False
 
 
-def extract_reviews(driver):
-    reviews_data = []
-    if not safe_scroll_reviews(driver):
+# Reads the loaded review cards (the first arguments[0] of them, if given)
+# in one execute_script round trip. Cards missing a reviewer, rating or
+# date come back as null.
+REVIEW_CARDS_JS = """
+var cards = Array.from(document.querySelectorAll('div.jftiEf.fontBodyMedium'));
+if (arguments[0] != null) {
+    cards = cards.slice(0, arguments[0]);
+}
+return cards.map(function (card) {
+    var reviewer = card.querySelector('div.d4r55');
+    var rating = card.querySelector('span.kvMYJc');
+    var date = card.querySelector('span.rsqaWe');
+    var text = card.querySelector('div.MyEned span.wiI7pd') || card.querySelector('div.MyEned');
+    if (!reviewer || !rating || !date) {
+        return null;
+    }
+    return {
+        reviewer: reviewer.innerText.trim(),
+        rating: rating.getAttribute('aria-label'),
+        date: date.innerText.trim(),
+        review: text ? text.innerText.trim() : '',
+        source_id: card.getAttribute('data-review-id')
+    };
+});
+"""
+
+def review_from_element(rev):
+    # Per-element path: about six WebDriver round trips per review
+    reviewer = rev.find_element(By.CSS_SELECTOR, 'div.d4r55').text.strip()
+    rating_el = rev.find_element(By.CSS_SELECTOR, 'span.kvMYJc')
+    rating = float(rating_el.get_attribute("aria-label").split()[0]) if rating_el else None
+    date = rev.find_element(By.CSS_SELECTOR, 'span.rsqaWe').text.strip()
+
+    review_text_el = None
+    if rev.find_elements(By.CSS_SELECTOR, 'div.MyEned span.wiI7pd'):
+        review_text_el = rev.find_element(By.CSS_SELECTOR, 'div.MyEned span.wiI7pd')
+    elif rev.find_elements(By.CSS_SELECTOR, 'div.MyEned'):
+        review_text_el = rev.find_element(By.CSS_SELECTOR, 'div.MyEned')
+
+    review_text = review_text_el.text.strip() if review_text_el else ""
+    source_id = rev.get_attribute("data-review-id")
+
+    return {
+        "reviewer": reviewer,
+        "rating": rating,
+        "date": date,
+        "review": review_text,
+        "source_id": source_id,
+    }
+
+def extract_review_cards(driver, limit=None):
+    """Extract the loaded review cards (the first `limit`, if given), in page order.
+
+    Uses REVIEW_CARDS_JS for the whole list and falls back to
+    review_from_element for cards the script could not parse.
+    Returns (reviews, fallback_count, failed_count).
+    """
+    cards = driver.execute_script(REVIEW_CARDS_JS, limit) or []
+    reviews = [None] * len(cards)
+    needs_fallback = []
+    for i, card in enumerate(cards):
+        try:
+            card["rating"] = float(card["rating"].split()[0])
+            reviews[i] = card
+        except (TypeError, AttributeError, ValueError, IndexError):
+            needs_fallback.append(i)
+
+    failed = 0
+    if needs_fallback:
+        elements = driver.find_elements(By.CSS_SELECTOR, 'div.jftiEf.fontBodyMedium')
+        for i in needs_fallback:
+            try:
+                reviews[i] = review_from_element(elements[i])
+            except:
+                failed += 1
+    return [r for r in reviews if r], len(needs_fallback) - failed, failed
+
+def extract_reviews(driver, capture=None, known_ids=None, stream=None):
+    """Scroll the Reviews tab and return its reviews.
+
+    With a ReviewStream, reviews go to the stream in windows as they load
+    and the return value is empty.
+    """
+    with METRICS.stage("review_scroll"):
+        scrolled = safe_scroll_reviews(driver, known_ids, stream)
+    if not scrolled:
         print("Skipping review extraction, Reviews tab not accessible.")
         return []
+    if stream:
+        # Streamed cards are gone from the DOM, so network payloads would only repeat them
+        with METRICS.stage("review_extract"):
+            reviews_data, _, failed_reviews = extract_review_cards(driver)
+        stream(reviews_data)
+        stream.failed += failed_reviews
+        print(f"Total reviews streamed: {stream.sent} | Failed to extract: {stream.failed}")
+        return []
+    if capture:
+        # Scrolling already pulled every review page over the network
+        with METRICS.stage("review_extract"):
+            reviews_data = capture.reviews_for(driver.current_url)
+            loaded = count_elements(driver, 'div.jftiEf.fontBodyMedium')
+        if reviews_data and len(reviews_data) >= loaded:
+            print(f"Total reviews decoded from network payloads: {len(reviews_data)}")
+            return reviews_data
+        if reviews_data:
+            # Evicted bodies or an inline first page: add the cards the capture missed
+            with METRICS.stage("review_extract"):
+                dom_reviews, _, failed_reviews = extract_review_cards(driver)
+            merged = {r["source_id"]: r for r in reviews_data}
+            extra = [r for r in dom_reviews if not r["source_id"] or r["source_id"] not in merged]
+            print(f"Total reviews: {len(reviews_data)} decoded from network payloads, {len(extra)} more "
+                  f"from the DOM | Failed to extract: {failed_reviews}")
+            return reviews_data + extra
+        print("No review payloads captured, reading review cards from the DOM")
     # After scrolling, scrape all available reviews
-    review_elements = driver.find_elements(By.CSS_SELECTOR, 'div.jftiEf.fontBodyMedium')
-    print(f"Found {len(review_elements)} reviews")
+    with METRICS.stage("review_extract"):
+        reviews_data, fallback_reviews, failed_reviews = extract_review_cards(driver)
+    print(f"Found {len(reviews_data) + failed_reviews} reviews")
+
+    print(f"Total reviews extracted: {len(reviews_data)} ({fallback_reviews} via per-element fallback) "
+          f"| Failed to extract: {failed_reviews}")
+    return reviews_data
+
+# ─────────────────────────────────────────────
+# 🌊 Streaming Review Windows (bounded DOM for huge review lists)
+# ─────────────────────────────────────────────
+# GOOGLE_REVIEW_WINDOW=N extracts and removes every N loaded review cards
+# while scrolling; 0 loads the whole list first
+REVIEW_WINDOW = int(os.getenv("GOOGLE_REVIEW_WINDOW", "0"))
+# Cards left in place so the feed keeps a scroll position to load from
+REVIEW_WINDOW_KEEP = 10
+
+PRUNE_REVIEW_CARDS_JS = """
+var cards = document.querySelectorAll('div.jftiEf.fontBodyMedium');
+var count = Math.min(arguments[0], cards.length);
+for (var i = 0; i < count; i++) {
+    cards[i].remove();
+}
+return count;
+"""
+
+class OrgTicket:
+    """The org id for a listing whose reviews are written before the listing itself.
+
+    persist_listing fills it in; review chunks queued after that job read it.
+    """
+
+    def __init__(self):
+        self.org_id = None
+        self.db_action = None
+
+class ReviewStream:
+    """Callable handed to safe_scroll_reviews; queues each window of reviews for the writer."""
+
+    def __init__(self, ticket):
+        self.ticket = ticket
+        self.sent = 0
+        self.failed = 0
+
+    def __call__(self, reviews):
+        if reviews:
+            self.sent += len(reviews)
+            submit_traced(write_review_chunk, self.ticket, reviews)
+
+def write_review_chunk(ticket, reviews):
+    if ticket.org_id:
+        REVIEW_SINK.add_many(reviews, ticket.org_id)
+
+def drain_review_window(driver, stream):
+    """Extract all but the last REVIEW_WINDOW_KEEP loaded cards into stream, then remove them.
+
+    Returns how many cards were removed from the page.
+    """
+    count = count_elements(driver, 'div.jftiEf.fontBodyMedium') - REVIEW_WINDOW_KEEP
+    if count <= 0:
+        return 0
+    reviews, _, failed = extract_review_cards(driver, count)
+    stream(reviews)
+    stream.failed += failed
+    return driver.execute_script(PRUNE_REVIEW_CARDS_JS, count)
+
+# ─────────────────────────────────────────────
+# 📸 One-Shot Place Details Snapshot
+# ─────────────────────────────────────────────
+# Reads every place field in one execute_script round trip. The hours
+# table is usually in the DOM while collapsed; when it isn't, hours fall
+# back to extract_hours(), which expands it.
+PLACE_SNAPSHOT_JS = """
+function text(sel) {
+    var el = document.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+}
+function attr(sel, name) {
+    var el = document.querySelector(sel);
+    return el ? el.getAttribute(name) : null;
+}
+var container = document.querySelector('div.OqCZI.WVXvdc');
+var hours = null;
+if (container) {
+    hours = Array.from(container.querySelectorAll('div.t39EBf table.eK4R0e tr')).map(function (row) {
+        var day = row.querySelector('td.ylH6lf');
+        var value = row.querySelector('td.mxowUb');
+        return [day ? day.innerText : '', value ? value.innerText : ''];
+    });
+}
+var website = document.querySelector('a[data-item-id="authority"]');
+return {
+    name_raw: text('h1.DUwDvf'),
+    address_label: attr('[data-item-id="address"]', 'aria-label'),
+    phone_label: attr('button[data-item-id^="phone:tel:"]', 'aria-label'),
+    website: website ? website.href : null,
+    rating_text: text('div.fontDisplayLarge'),
+    excerpt: text('span.wiI7pd'),
+    review_count_text: text('div.jANrlb div.fontBodySmall'),
+    hours_present: !!container,
+    hours_rows: hours,
+    url: window.location.href
+};
+"""
+
+SNAPSHOT_FIELDS = (
+    "name_raw", "address_label", "phone_label", "website",
+    "rating_text", "excerpt", "review_count_text", "hours_rows",
+)
 
-    failed_reviews = 0
-    for rev in review_elements:
+@dataclass
+class PlaceSnapshot:
+    name_raw: str = None
+    address_label: str = None
+    phone_label: str = None
+    website: str = None
+    rating_text: str = None
+    excerpt: str = None
+    review_count_text: str = None
+    hours_present: bool = False
+    hours_rows: list = None
+    url: str = None
+    missing: list = field(default_factory=list)
+
+    @property
+    def rating(self):
         try:
-            reviewer = rev.find_element(By.CSS_SELECTOR, 'div.d4r55').text.strip()
-            rating_el = rev.find_element(By.CSS_SELECTOR, 'span.kvMYJc')
-            rating = float(rating_el.get_attribute("aria-label").split()[0]) if rating_el else None
-            date = rev.find_element(By.CSS_SELECTOR, 'span.rsqaWe').text.strip()
-
-            review_text_el = None
-            if rev.find_elements(By.CSS_SELECTOR, 'div.MyEned span.wiI7pd'):
-                review_text_el = rev.find_element(By.CSS_SELECTOR, 'div.MyEned span.wiI7pd')
-            elif rev.find_elements(By.CSS_SELECTOR, 'div.MyEned'):
-                review_text_el = rev.find_element(By.CSS_SELECTOR, 'div.MyEned')
-
-            review_text = review_text_el.text.strip() if review_text_el else ""
-            source_id = rev.get_attribute("data-review-id")
-
-            reviews_data.append({
-                "reviewer": reviewer,
-                "rating": rating,
-                "date": date,
-                "review": review_text,
-                "source_id": source_id,
-            })
-        except:
-            failed_reviews += 1
+            return float(self.rating_text)
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def review_count(self):
+        match = re.search(r'([\d,]+)', self.review_count_text or "")
+        return int(match.group(1).replace(',', '')) if match else None
+
+def snapshot_place(driver):
+    """Snapshot the open listing's fields with PLACE_SNAPSHOT_JS.
+
+    Fields the page did not have are None and listed in .missing. If the
+    script itself fails, the fields are read one WebDriver call at a time.
+    """
+    try:
+        raw = driver.execute_script(PLACE_SNAPSHOT_JS)
+        snap = PlaceSnapshot(**raw)
+    except Exception as e:
+        print(f"Place snapshot script failed ({e}), reading fields one by one")
+        snap = snapshot_place_dom(driver)
+    snap.missing = [name for name in SNAPSHOT_FIELDS if not getattr(snap, name)]
+    return snap
+
+def snapshot_place_dom(driver):
+    def text(selector):
+        els = driver.find_elements(By.CSS_SELECTOR, selector)
+        return els[0].text.strip() if els else None
+
+    def attr(selector, name):
+        els = driver.find_elements(By.CSS_SELECTOR, selector)
+        return els[0].get_attribute(name) if els else None
+
+    return PlaceSnapshot(
+        name_raw=text('h1.DUwDvf'),
+        address_label=attr('[data-item-id="address"]', "aria-label"),
+        phone_label=attr('button[data-item-id^="phone:tel:"]', "aria-label"),
+        website=attr('a[data-item-id="authority"]', "href"),
+        rating_text=text('div.fontDisplayLarge'),
+        excerpt=text('span.wiI7pd'),
+        review_count_text=text('div.jANrlb div.fontBodySmall'),
+        hours_present=bool(driver.find_elements(By.CSS_SELECTOR, "div.OqCZI.WVXvdc")),
+        url=driver.current_url,
+    )
+
+def snapshot_hours(driver, snap):
+    if snap.hours_rows:
+        return hours_json(snap.hours_rows)
+    if snap.hours_present:
+        return extract_hours(driver)
+    print("Hours not available for this listing.")
+    return "Unavailable"
+
+PLACE_COORDS_RE = re.compile(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)")
+PLACE_ID_RE = re.compile(r"!16s%2Fg%2F([^!&]+)")
+
+def parse_place_url(detail_link):
+    """(lat, lng, place_id) from a Maps place URL; None for parts it lacks."""
+    try:
+        parts = PLACE_COORDS_RE.findall(detail_link)
+        lat, lng = map(float, parts[0]) if parts else (None, None)
+
+        place_id_match = PLACE_ID_RE.search(detail_link)
+        if place_id_match:
+            raw_place_id = place_id_match.group(1)
+            place_id = urllib.parse.unquote(raw_place_id).split("?")[0]
+        else:
+            place_id = None
+    except Exception as e:
+        lat, lng, place_id = None, None, None
+    return lat, lng, place_id
+
+# ─────────────────────────────────────────────
+# 📡 Network Capture via Chrome DevTools Protocol
+# ─────────────────────────────────────────────
+# GOOGLE_NETWORK_CAPTURE=1 turns on Chrome's performance log and decodes
+# the search, place and review payloads Maps downloads anyway. Decoded
+# place fields only fill what the DOM snapshot lacks, and decoded reviews
+# are topped up from the DOM when the capture is partial.
+NETWORK_CAPTURE = os.getenv("GOOGLE_NETWORK_CAPTURE", "0") == "1"
+# Oldest decoded places beyond this are dropped (a few queries' worth)
+NETWORK_CAPTURE_MAX_PLACES = 500
+
+XSSI_PREFIX = ")]}'"
+FEATURE_ID_RE = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)")
+MAPS_PAYLOAD_KINDS = (
+    ("search", "/search?tbm=map"),
+    ("place", "/maps/preview/place"),
+    ("reviews", "/maps/rpc/listugcposts"),
+)
+
+# Positional layout of the place record Maps ships in its JSON arrays
+# (data[6] of a place payload, result[14] of a search payload). These are
+# undocumented; a wrong path just yields None and the DOM fills the gap.
+PLACE_PATHS = {
+    "name_raw": (11,),
+    "address_label": (39,),
+    "phone_label": (178, 0, 0),
+    "website": (7, 0),
+    "rating": (4, 7),
+    "review_count": (4, 8),
+    "latitude": (9, 2),
+    "longitude": (9, 3),
+    "feature_id": (10,),
+    "hours": (34, 1),
+}
+REVIEW_PATHS = {
+    "source_id": (0,),
+    "reviewer": (1, 4, 5, 0),
+    "date": (1, 6),
+    "rating": (2, 0, 0),
+    "review": (2, 15, 0, 0),
+}
+
+def dig(obj, path):
+    for key in path:
+        try:
+            obj = obj[key]
+        except (IndexError, KeyError, TypeError):
+            return None
+    return obj
+
+def decode_maps_payload(body):
+    """Parse a Maps XHR body: strip the XSSI guard, unwrap {"d": "..."} bodies."""
+    body = body.strip()
+    if body.startswith(XSSI_PREFIX):
+        body = body[len(XSSI_PREFIX):]
+    data = json.loads(body)
+    if isinstance(data, dict) and isinstance(data.get("d"), str):
+        return decode_maps_payload(data["d"])
+    return data
+
+def decode_place_info(info):
+    place = {name: dig(info, path) for name, path in PLACE_PATHS.items()}
+    hours = place.pop("hours")
+    if isinstance(hours, list):
+        rows = []
+        for day in hours:
+            day_name = dig(day, (0,))
+            spans = dig(day, (3,)) or []
+            text = ", ".join(span[0] for span in spans if isinstance(span, list) and span and isinstance(span[0], str))
+            if isinstance(day_name, str):
+                rows.append([day_name, text or "Closed"])
+        place["hours_rows"] = rows or None
+    return place
+
+def decode_place_payload(data):
+    return decode_place_info(dig(data, (6,)))
+
+def decode_search_payload(data):
+    results = dig(data, (0, 1)) or []
+    return [decode_place_info(dig(result, (14,))) for result in results if dig(result, (14,))]
+
+def decode_review_payload(data):
+    reviews = []
+    for item in dig(data, (2,)) or []:
+        review = {name: dig(item, (0,) + path) for name, path in REVIEW_PATHS.items()}
+        if review["source_id"] and review["reviewer"] and review["rating"] is not None:
+            review["rating"] = float(review["rating"])
+            review["review"] = review["review"] or ""
+            reviews.append(review)
+    return reviews
+
+class NetworkCapture:
+    """Decoded Maps payloads for one driver, keyed by place feature id (0x…:0x…)."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.places = {}
+        self.reviews = {}
+        self.pending = {}  # requestId -> (kind, url) until the body is available
+        self.decode_errors = 0
+
+    def poll(self):
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            params = message.get("params", {})
+            if message.get("method") == "Network.responseReceived":
+                url = params["response"]["url"]
+                for kind, marker in MAPS_PAYLOAD_KINDS:
+                    if marker in url:
+                        self.pending[params["requestId"]] = (kind, urllib.parse.unquote(url))
+            elif message.get("method") == "Network.loadingFinished" and params.get("requestId") in self.pending:
+                kind, url = self.pending.pop(params["requestId"])
+                try:
+                    body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                    self._store(kind, url, decode_maps_payload(body["body"]))
+                except Exception:
+                    self.decode_errors += 1  # body evicted, other tab, or a layout we don't know
+
+    def _store(self, kind, url, data):
+        if kind == "reviews":
+            match = FEATURE_ID_RE.search(url)
+            if match:
+                bucket = self.reviews.setdefault(match.group(1), {})
+                for review in decode_review_payload(data):
+                    bucket[review["source_id"]] = review
+            return
+        places = decode_search_payload(data) if kind == "search" else [decode_place_payload(data)]
+        for place in places:
+            if place.get("feature_id"):
+                # Place payloads are richer than search results; never downgrade
+                if kind == "place" or place["feature_id"] not in self.places:
+                    self.places[place["feature_id"]] = place
+
+    def place_for(self, url):
+        self.poll()
+        match = FEATURE_ID_RE.search(urllib.parse.unquote(url or ""))
+        return self.places.get(match.group(1)) if match else None
+
+    def reviews_for(self, url):
+        self.poll()
+        match = FEATURE_ID_RE.search(urllib.parse.unquote(url or ""))
+        return list(self.reviews.get(match.group(1), {}).values()) if match else []
+
+    def forget(self, url):
+        """Drop a place's payloads once scrape_listing has used them."""
+        match = FEATURE_ID_RE.search(urllib.parse.unquote(url or ""))
+        if match:
+            self.places.pop(match.group(1), None)
+            self.reviews.pop(match.group(1), None)
+        # Search results for listings that are never opened would pile up otherwise
+        for bucket in (self.places, self.reviews):
+            while len(bucket) > NETWORK_CAPTURE_MAX_PLACES:
+                bucket.pop(next(iter(bucket)))
+
+NETWORK_CAPTURES = weakref.WeakKeyDictionary()
+
+def network_capture_for(driver):
+    if not NETWORK_CAPTURE:
+        return None
+    if driver not in NETWORK_CAPTURES:
+        NETWORK_CAPTURES[driver] = NetworkCapture(driver)
+    return NETWORK_CAPTURES[driver]
+
+# PlaceSnapshot field -> decoded payload field
+NETWORK_SNAPSHOT_FIELDS = {
+    "name_raw": "name_raw",
+    "address_label": "address_label",
+    "phone_label": "phone_label",
+    "website": "website",
+    "hours_rows": "hours_rows",
+    "rating_text": "rating",
+    "review_count_text": "review_count",
+}
+
+def apply_network_place(snap, place):
+    """Fill the fields the DOM snapshot is missing from a decoded payload.
+
+    PLACE_PATHS are guesses, so a decoded value never replaces one the DOM had.
+    """
+    for name in snap.missing:
+        value = place.get(NETWORK_SNAPSHOT_FIELDS.get(name, ""))
+        if value in (None, "", []):
             continue
+        setattr(snap, name, value if name == "hours_rows" else str(value))
+    snap.missing = [name for name in SNAPSHOT_FIELDS if not getattr(snap, name)]
+
+# ─────────────────────────────────────────────
+# 🎞️ Page Snapshot Recording (offline replay)
+# ─────────────────────────────────────────────
+# Point GOOGLE_MAPS_URL at maps_standin.py to replay recorded pages offline
+MAPS_BASE_URL = os.getenv("GOOGLE_MAPS_URL", "https://www.google.com/maps")
+# When set, search, place and reviews pages are saved here for maps_standin.py
+SNAPSHOT_RECORD_DIR = os.getenv("GOOGLE_SNAPSHOT_RECORD_DIR")
+
+SCRIPT_TAG_RE = re.compile(r"<script\b[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL)
+
+def snapshot_file(kind, key):
+    # maps_standin.snapshot_file must name files the same way
+    return os.path.join(kind, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html")
+
+def record_snapshot(kind, key, driver):
+    """Save the rendered page (scripts stripped) as snapshot `kind` for `key`."""
+    if not SNAPSHOT_RECORD_DIR:
+        return
+    try:
+        path = os.path.join(SNAPSHOT_RECORD_DIR, snapshot_file(kind, key))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SCRIPT_TAG_RE.sub("", driver.page_source))
+        with open(os.path.join(SNAPSHOT_RECORD_DIR, "manifest.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"kind": kind, "key": key, "file": snapshot_file(kind, key)}) + "\n")
+    except Exception as e:
+        print(f"Snapshot recording failed for {kind} {key}: {e}")
+
+# ─────────────────────────────────────────────
+# 🔬 WebDriver Command Profiler (opt-in)
+# ─────────────────────────────────────────────
+# GOOGLE_PROFILE_DRIVER=1 counts and times every chromedriver round trip and
+# prints the GOOGLE_PROFILE_TOP busiest (helper, command) pairs per query
+PROFILE_DRIVER = os.getenv("GOOGLE_PROFILE_DRIVER", "0") == "1"
+PROFILE_TOP = int(os.getenv("GOOGLE_PROFILE_TOP", "15"))
+# Generic wait plumbing; round trips made inside it count toward its caller
+PROFILE_PASSTHROUGH = {"wait_until", "count_elements", "condition", "<lambda>", "<genexpr>", "<listcomp>"}
+
+class DriverProfiler:
+    """Wraps driver.execute, which every WebDriver and WebElement command goes through.
+
+    Each round trip is attributed to the public selenium method that issued
+    it (find_element, get_attribute, execute_script, click, get, ...) and to
+    the nearest scraper function up the stack.
+    """
+
+    def __init__(self, driver):
+        self.stats = {}  # (helper, op) -> [calls, seconds]
+        self.execute = driver.execute
+        driver.execute = self._execute
+
+    def _execute(self, driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return self.execute(driver_command, params)
+        finally:
+            key = self._attribute(driver_command)
+            stats = self.stats.setdefault(key, [0, 0.0])
+            stats[0] += 1
+            stats[1] += time.perf_counter() - start
+
+    @staticmethod
+    def _attribute(driver_command):
+        op, helper = driver_command, "?"
+        frame = sys._getframe(2)
+        in_wait = False
+        while frame and frame.f_globals.get("__name__", "").startswith("selenium"):
+            # The outermost driver/element method is the op; WebDriverWait and
+            # expected_conditions (selenium.webdriver.support) sit above it, so
+            # the command inside a wait keeps its own name instead of `until`
+            in_wait = in_wait or frame.f_globals["__name__"].startswith("selenium.webdriver.support")
+            if not in_wait and not frame.f_code.co_name.startswith("_"):
+                op = frame.f_code.co_name
+            frame = frame.f_back
+        while frame:
+            if frame.f_globals is globals() and frame.f_code.co_name not in PROFILE_PASSTHROUGH:
+                helper = frame.f_code.co_name
+                break
+            frame = frame.f_back
+        return helper, op
+
+    def report(self, label, top=PROFILE_TOP):
+        """Print the busiest (helper, op) pairs since the last report, then reset."""
+        stats, self.stats = self.stats, {}
+        calls = sum(c for c, _ in stats.values())
+        seconds = sum(s for _, s in stats.values())
+        print(f"\n--- WebDriver round trips for '{label}': {calls} calls, {seconds:.1f}s ---")
+        for (helper, op), (n, total) in sorted(stats.items(), key=lambda kv: kv[1][1], reverse=True)[:top]:
+            print(f"{helper:<24} {op:<22} {n:>6} calls {total:>8.2f}s total {total / n * 1000:>7.1f}ms avg")
+
+DRIVER_PROFILERS = weakref.WeakKeyDictionary()
+
+def profile_driver(driver):
+    if PROFILE_DRIVER and driver not in DRIVER_PROFILERS:
+        DRIVER_PROFILERS[driver] = DriverProfiler(driver)
+    return driver
+
+def driver_profile_report(driver, label):
+    profiler = DRIVER_PROFILERS.get(driver)
+    if profiler:
+        profiler.report(label)
 
-    print(f"Total reviews extracted: {len(reviews_data)} | Failed to extract: {failed_reviews}")
-    return reviews_data
 # ─────────────────────────────────────────────
 # 🔍 Main Google Maps Scraper
 # ─────────────────────────────────────────────
-def scrape_google_maps(queries, wait_time=3, limit=None):
-    global READ_CONN, WRITE_CONN
+CHROMEDRIVER_PATH = "/opt/homebrew/bin/chromedriver"  # Hardcoded for stability, avoids reinstall delays
+# Use env var or fallback to local folder
+OUTPUT_DIR = os.getenv("GOOGLE_OUTPUT_DIR", "./scraped-data")
+
+def build_chrome_options():
     # ChromeOptions setup for fully headless and UI-suppressed scraping
     options = webdriver.ChromeOptions()
     options.add_argument("--headless=new")
@@ -418,372 +2096,1263 @@ def scrape_google_maps(queries, wait_time=3, limit=None):
     options.add_argument("--disable-extensions")
     options.add_argument("--remote-allow-origins=*")
     # options.add_argument("--single-window")  # Prevents new tabs or windows (commented out for headless mode)
+    if NETWORK_CAPTURE:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if LISTING_TABS > 1:
+        # Keep preloading background tabs at full speed
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+    return options
+
+def start_chrome(options):
     print("Initializing Chrome WebDriver...")
     init_start = time.time()
-
-    driver_path = "/opt/homebrew/bin/chromedriver"  # Hardcoded for stability, avoids reinstall delays
-    driver = webdriver.Chrome(service=Service(driver_path), options=options)
-
+    driver = webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=options)
     print(f"Chrome WebDriver initialized in {time.time() - init_start:.2f} seconds")
+    return profile_driver(driver)
 
-    all_data = []
-
-    if limit:
-        queries = queries[:limit]
+def run_search(driver, query):
+    """Search Maps for query.
 
-    from gdh_collect.utils.helpers import save_to_csv
-    # Use env var or fallback to local folder
-    OUTPUT_DIR = os.getenv("GOOGLE_OUTPUT_DIR", "./scraped-data")
+    Returns True when the results feed loaded, False when Maps has no results
+    for the query, and None when the search itself failed.
+    """
+    driver.get(MAPS_BASE_URL)
+    WebDriverWait(driver, 60).until(
+        EC.presence_of_element_located((By.ID, "searchboxinput"))
+    )
 
-    script_start = datetime.now()
-    print(f"Running Google Maps Scraper for {len(queries)} queries (limit={limit})")
+    search_box = driver.find_element(By.ID, "searchboxinput")
+    search_box.clear()
+    search_box.send_keys(query)
+    driver.find_element(By.ID, "searchbox-searchbutton").click()
 
-    print(f"Setup completed in {(datetime.now() - script_start).total_seconds():.2f} seconds, starting scrape...")
-    for i, query in enumerate(queries, 1):
-        start_time = datetime.now()
-        print(f"\n--- Starting search {i}/{len(queries)}: {query} ---")
+    try:
+        WebDriverWait(driver, 60).until(
+            EC.any_of(
+                EC.presence_of_element_located((By.XPATH, '//div[@role="feed"]')),
+                EC.presence_of_element_located((By.XPATH, '//div[contains(text(),"could not find")]')),
+                EC.presence_of_element_located((By.XPATH, '//div[contains(text(),"No results")]'))
+            )
+        )
+    except Exception as e:
+        print(f"Error loading results for '{query}': {type(e).__name__} - {e}. Retrying once...")
+        METRICS.inc("search_retries")
+        # Retry logic after timeout
         try:
-            driver.get("https://www.google.com/maps")
+            driver.refresh()
+            wait_until(driver, EC.presence_of_element_located((By.ID, "searchboxinput")), "search_reload")
+            search_box = driver.find_element(By.ID, "searchboxinput")
+            search_box.clear()
+            search_box.send_keys(query)
+            driver.find_element(By.ID, "searchbox-searchbutton").click()
             WebDriverWait(driver, 60).until(
-                EC.presence_of_element_located((By.ID, "searchboxinput"))
+                EC.presence_of_element_located((By.XPATH, '//div[@role="feed"]'))
             )
+        except Exception as e:
+            print(f"Second attempt failed for '{query}': {type(e).__name__} - {e}")
+            return None
 
+    if driver.find_elements(By.XPATH, '//div[contains(text(),"could not find")]') or \
+       driver.find_elements(By.XPATH, '//div[contains(text(),"No results")]'):
+        print(f"No results found for: {query}")
+        return False
+    else:
+        if not wait_until(driver, EC.presence_of_element_located((By.XPATH, '//div[@role="feed"]')), "feed_appear"):
+            print(f"Retrying search for {query} after short delay...")
+            METRICS.inc("search_retries")
+            driver.refresh()
+            wait_until(driver, EC.presence_of_element_located((By.ID, "searchboxinput")), "search_reload")
             search_box = driver.find_element(By.ID, "searchboxinput")
             search_box.clear()
             search_box.send_keys(query)
             driver.find_element(By.ID, "searchbox-searchbutton").click()
+            WebDriverWait(driver, 60).until(
+                EC.presence_of_element_located((By.XPATH, '//div[@role="feed"]'))
+            )
+    return True
+
+# Feed cards in one round trip: href plus the rating and review count shown on the card
+FEED_CARDS_JS = """
+return Array.from(document.querySelectorAll('div.Nv2PK.tH5CWc.THOPZb')).map(function (card) {
+    var link = card.querySelector('a.hfpxzc');
+    var rating = card.querySelector('span.MW4etd');
+    var count = card.querySelector('span.UY7F9');
+    return {
+        href: link ? link.href : null,
+        rating: rating ? rating.textContent : null,
+        review_count: count ? count.textContent : null
+    };
+}).filter(function (card) { return card.href; });
+"""
+
+def collect_listing_cards(driver):
+    """Scroll the results feed to the end; returns [{href, rating, review_count}]."""
+    scrollable = driver.find_element(By.XPATH, '//div[@role="feed"]')
+    loaded = count_elements(driver, 'div.Nv2PK')
+    for _ in range(10):
+        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable)
+        # Stop once the feed stops growing or shows its end-of-list marker
+        grown = wait_until(driver, count_grows('div.Nv2PK', loaded), "feed_scroll")
+        if not grown or driver.find_elements(By.CSS_SELECTOR, 'span.HlvSq'):
+            break
+        loaded = grown
+
+    cards = driver.execute_script(FEED_CARDS_JS) or []
+    for card in cards:
+        card["rating"] = to_float(card["rating"].replace(",", ".")) if card["rating"] else None
+        digits = re.sub(r"[^\d]", "", card["review_count"] or "")
+        card["review_count"] = int(digits) if digits else None
+    return cards
+
+# ─────────────────────────────────────────────
+# 📒 Run Journal (resume after a crash)
+# ─────────────────────────────────────────────
+# One journal per run id (GOOGLE_RUN_ID); a run that finishes every query
+# rotates its journal aside, so the next run with the same id starts fresh.
+# GOOGLE_RUN_JOURNAL overrides the path; "" disables it. Job runs never use
+# it: the scrape_jobs table tracks their progress.
+RUN_ID = os.getenv("GOOGLE_RUN_ID", "")
+RUN_JOURNAL_PATH = os.getenv("GOOGLE_RUN_JOURNAL", os.path.join(
+    OUTPUT_DIR, f"run_journal-{RUN_ID}.jsonl" if RUN_ID else "run_journal.jsonl"
+))
+
+def listing_key(href):
+    # Listing hrefs carry per-session query params (authuser, hl, rclk)
+    return href.split("?")[0]
+
+class RunJournal:
+    """Append-only JSONL log of finished queries and listings.
+
+    Every line is flushed as it is written, so a killed run loses at most
+    the listing in progress. Loading the file on startup tells
+    scrape_google_maps which queries and listing URLs to skip.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done_queries = set()
+        self.done_listings = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a killed run
+                    if entry.get("type") == "query":
+                        self.done_queries.add(entry["query"])
+                    elif entry.get("type") == "listing":
+                        self.done_listings.add(entry["href"])
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def query_done(self, query):
+        return query in self.done_queries
+
+    def listing_done(self, href):
+        return listing_key(href) in self.done_listings
+
+    def _write(self, entry):
+        entry["at"] = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    def mark_listing(self, query, href):
+        key = listing_key(href)
+        self.done_listings.add(key)
+        self._write({"type": "listing", "query": query, "href": key})
+
+    def mark_query(self, query):
+        self.done_queries.add(query)
+        self._write({"type": "query", "query": query})
+
+    def close(self):
+        self.file.close()
+
+    def rotate(self):
+        """Close the journal and move it aside as <name>.<timestamp>.jsonl."""
+        self.close()
+        root, ext = os.path.splitext(self.path)
+        done_path = f"{root}.{datetime.now():%Y%m%dT%H%M%S}{ext}"
+        os.replace(self.path, done_path)
+        print(f"Every query done; run journal moved to {done_path}")
+
+def open_run_journal():
+    if not RUN_JOURNAL_PATH:
+        return None
+    journal = RunJournal(RUN_JOURNAL_PATH)
+    print(f"Run journal {RUN_JOURNAL_PATH}: {len(journal.done_queries)} queries and "
+          f"{len(journal.done_listings)} listings already done")
+    return journal
+
+def close_run_journal(journal, queries):
+    # Call once the writer has drained, so queued QueryTracker.finish calls have run
+    if all(journal.query_done(q) for q in queries):
+        journal.rotate()
+    else:
+        journal.close()
+
+class QueryTracker:
+    """Which of one query's listings made it to the DB, org and reviews both.
+
+    Stands in for the journal in the write path: mark_listing() is called
+    once a listing is written (or skipped) and passed on to the journal, if
+    any. finish() runs on the writer after the query's writes, marks the
+    query done only when no listing is left, and reports the outcome to
+    on_done(query, listings) with listings None when some were not written,
+    so a job goes back to pending instead of being marked done.
+    """
+
+    def __init__(self, query, hrefs, journal=None, on_done=None):
+        self.query = query
+        self.journal = journal
+        self.on_done = on_done
+        self.lock = threading.Lock()
+        self.left = {listing_key(href) for href in hrefs}
+        self.total = len(self.left)
+
+    def mark_listing(self, query, href):
+        with self.lock:
+            self.left.discard(listing_key(href))
+        if self.journal:
+            self.journal.mark_listing(query, href)
+
+    def finish(self, listings):
+        with self.lock:
+            left = len(self.left)
+        if left:
+            print(f"Leaving '{self.query}' open: {left}/{self.total} listings were not written")
+            listings = None
+        elif self.journal:
+            self.journal.mark_query(self.query)
+        if self.on_done:
+            self.on_done(self.query, listings)
+
+# ─────────────────────────────────────────────
+# 🧊 Freshness Cache (skip recently scraped, unchanged listings)
+# ─────────────────────────────────────────────
+# GOOGLE_FRESHNESS_TTL_HOURS > 0 turns it on. Within the TTL, a listing whose
+# feed card shows the same rating and review count as when it was last
+# written is not opened at all.
+FRESHNESS_TTL_HOURS = float(os.getenv("GOOGLE_FRESHNESS_TTL_HOURS", "0"))
+FRESHNESS_PATH = os.getenv("GOOGLE_FRESHNESS_CACHE", os.path.join(OUTPUT_DIR, "freshness.jsonl"))
+
+def canonical_place_key(href):
+    """Stable id for a listing: the !16s place ID, else the !1s feature id, else the bare href."""
+    place_id = PLACE_ID_RE.search(href)
+    if place_id:
+        return "place:" + urllib.parse.unquote(place_id.group(1))
+    feature_id = FEATURE_ID_RE.search(href)
+    if feature_id:
+        return "feature:" + feature_id.group(1)
+    return listing_key(href)
+
+class FreshnessCache:
+    """Last-write record per place, appended as JSON lines (the last line for a key wins)."""
+
+    def __init__(self, path, ttl_hours):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.skipped = 0
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry["key"]] = entry
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def is_fresh(self, card):
+        """True when card's rating and review count match a record younger than the TTL."""
+        if card.get("rating") is None or card.get("review_count") is None:
+            return False
+        with self.lock:
+            entry = self.entries.get(canonical_place_key(card["href"]))
+        if not entry or time.time() - entry["scraped_at"] > self.ttl:
+            return False
+        return entry["rating"] == card["rating"] and entry["review_count"] == card["review_count"]
+
+    def record(self, card, scraped_data):
+        entry = {
+            "key": canonical_place_key(card["href"]),
+            "scraped_at": time.time(),
+            "rating": card.get("rating"),
+            "review_count": card.get("review_count"),
+            # Same value as organizations.content_hash for this write
+            "fingerprint": org_content_hash(scraped_data),
+        }
+        with self.lock:
+            self.entries[entry["key"]] = entry
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def open_freshness_cache():
+    if FRESHNESS_TTL_HOURS <= 0 or not FRESHNESS_PATH:
+        return None
+    cache = FreshnessCache(FRESHNESS_PATH, FRESHNESS_TTL_HOURS)
+    print(f"Freshness cache {FRESHNESS_PATH}: {len(cache.entries)} places, TTL {FRESHNESS_TTL_HOURS:g}h")
+    return cache
+
+# ─────────────────────────────────────────────
+# 🔁 Run-Wide Listing Dedup (overlapping queries)
+# ─────────────────────────────────────────────
+# GOOGLE_DEDUP_LISTINGS=0 scrapes a place again for every query that returns it
+DEDUP_LISTINGS = os.getenv("GOOGLE_DEDUP_LISTINGS", "1") != "0"
+
+class SeenPlaces:
+    """Places already claimed this run, keyed by canonical_place_key.
+
+    The first query to surface a place claims it and scrapes it; later
+    queries only add themselves to the place's surfaced_by list.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.surfaced_by = {}  # key -> [query, ...], first one scraped it
+        self.query_stats = {}  # query -> (listings, duplicates)
+
+    def claim(self, query, listings):
+        """Return the (idx, href) listings no earlier query has claimed."""
+        new = []
+        with self.lock:
+            for idx, href in listings:
+                queries = self.surfaced_by.setdefault(canonical_place_key(href), [])
+                if not queries:
+                    new.append((idx, href))
+                if query not in queries:
+                    queries.append(query)
+            self.query_stats[query] = (len(listings), len(listings) - len(new))
+        return new
+
+    def report(self):
+        with self.lock:
+            places = len(self.surfaced_by)
+            shared = sum(len(q) > 1 for q in self.surfaced_by.values())
+            listings = sum(n for n, _ in self.query_stats.values())
+            duplicates = sum(d for _, d in self.query_stats.values())
+        print("\n--- Cross-query duplicates ---")
+        print(f"{places} unique places from {listings} listings; {shared} surfaced by more than one query, "
+              f"{duplicates} re-scrapes avoided ({duplicates / listings if listings else 0.0:.0%})")
+        METRICS.write({"type": "duplicates", "surfaced_by": {k: q for k, q in self.surfaced_by.items() if len(q) > 1}})
 
+# ─────────────────────────────────────────────
+# 🗂️ Listing Page Navigation (single tab or K-tab fan-out)
+# ─────────────────────────────────────────────
+# Tabs kept open per driver; > 1 preloads upcoming listings while one is extracted
+LISTING_TABS = int(os.getenv("GOOGLE_LISTING_TABS", "1"))
+
+def on_listing(href):
+    """Wait condition: the current tab's URL is href's place (by feature id when it has one)."""
+    href = urllib.parse.unquote(href)
+    feature_id = FEATURE_ID_RE.search(href)
+    target = feature_id.group(1) if feature_id else listing_key(href)
+
+    def check(driver):
+        url = urllib.parse.unquote(driver.current_url or "")
+        return target in url if feature_id else listing_key(url) == target
+    return check
+
+def iter_listing_pages(driver, listings, tabs=1):
+    """Yield (idx, href) for each (idx, href) in listings with driver on that page.
+
+    With tabs == 1 every listing is opened with driver.get in the only window.
+    With tabs > 1 the next listings start loading in background tabs while
+    the caller extracts the current one, and the driver switches to each tab
+    in order once its turn comes.
+    """
+    if tabs <= 1:
+        for idx, href in listings:
             try:
-                WebDriverWait(driver, 60).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.XPATH, '//div[@role="feed"]')),
-                        EC.presence_of_element_located((By.XPATH, '//div[contains(text(),"could not find")]')),
-                        EC.presence_of_element_located((By.XPATH, '//div[contains(text(),"No results")]'))
-                    )
-                )
-            except Exception as e:
-                print(f"Error loading results for '{query}': {type(e).__name__} - {e}. Retrying once...")
-                # Retry logic after timeout
-                try:
-                    driver.refresh()
-                    time.sleep(3)
-                    search_box = driver.find_element(By.ID, "searchboxinput")
-                    search_box.clear()
-                    search_box.send_keys(query)
-                    driver.find_element(By.ID, "searchbox-searchbutton").click()
-                    WebDriverWait(driver, 60).until(
-                        EC.presence_of_element_located((By.XPATH, '//div[@role="feed"]'))
-                    )
-                except Exception as e:
-                    print(f"Second attempt failed for '{query}': {type(e).__name__} - {e}")
-                    continue
+                close_place_details(driver)
+                dismiss_overlay(driver)
 
-            if driver.find_elements(By.XPATH, '//div[contains(text(),"could not find")]') or \
-               driver.find_elements(By.XPATH, '//div[contains(text(),"No results")]'):
-                print(f"No results found for: {query}")
+                with METRICS.stage("listing_nav"):
+                    driver.get(href)
+                # Ensure only one tab remains open (prevents unintended new tabs)
+                while len(driver.window_handles) > 1:
+                    driver.switch_to.window(driver.window_handles[-1])
+                    driver.close()
+                driver.switch_to.window(driver.window_handles[0])
+            except Exception as e:
+                print(f"Failed to scrape a result: {e}")
                 continue
-            else:
-                time.sleep(2)
-                if not driver.find_elements(By.XPATH, '//div[@role="feed"]'):
-                    print(f"Retrying search for {query} after short delay...")
-                    driver.refresh()
-                    time.sleep(3)
-                    search_box = driver.find_element(By.ID, "searchboxinput")
-                    search_box.clear()
-                    search_box.send_keys(query)
-                    driver.find_element(By.ID, "searchbox-searchbutton").click()
-                    WebDriverWait(driver, 60).until(
-                        EC.presence_of_element_located((By.XPATH, '//div[@role="feed"]'))
-                    )
-
-            scrollable = driver.find_element(By.XPATH, '//div[@role="feed"]')
-            for _ in range(10):
-                driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable)
-                # Reduce sleep for faster scrolling but keep a minimal delay for rendering
-                time.sleep(0.3)
-
-            results = driver.find_elements(By.CSS_SELECTOR, 'div.Nv2PK.tH5CWc.THOPZb')
-            listing_urls = [r.find_element(By.CSS_SELECTOR, 'a.hfpxzc').get_attribute("href") for r in results]
-            print(f"Found {len(listing_urls)} listings. Extracting details...")
-
-            query_results_start = datetime.now()
-
-            for idx, href in enumerate(listing_urls):
-                scrape_start = datetime.now()
-                try:
-                    close_place_details(driver)
-                    dismiss_overlay(driver)
+            yield idx, href
+        return
 
-                    driver.get(href)
-                    # Ensure only one tab remains open (prevents unintended new tabs)
-                    while len(driver.window_handles) > 1:
-                        driver.switch_to.window(driver.window_handles[-1])
-                        driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, 'h1.DUwDvf'))
-                    )
-                    time.sleep(0.3)
-
-                    name_raw = driver.find_element(By.CSS_SELECTOR, 'h1.DUwDvf').text.strip()
-                    name = clean_name(name_raw)
+    main = driver.current_window_handle
+    handles = [main]
+    for _ in range(min(tabs, len(listings)) - 1):
+        driver.switch_to.new_window("tab")
+        handles.append(driver.current_window_handle)
 
-                    try:
-                        addr_el = driver.find_element(By.CSS_SELECTOR, '[data-item-id="address"]')
-                        addr = addr_el.get_attribute("aria-label").replace("Address: ", "")
-                        zip_code = extract_zip(addr)
-                        address = normalize_address(addr)
-                    except Exception as e:
-                        address = "No Address Available"
-                        zip_code = ""
+    upcoming = iter(listings)
+    loading = deque()
 
-                    try:
-                        phone_btn = driver.find_element(By.CSS_SELECTOR, 'button[data-item-id^="phone:tel:"]')
-                        phone_text = phone_btn.get_attribute("aria-label").replace("Phone: ", "").strip()
-                        phone = clean_phone(phone_text)
-                    except Exception as e:
-                        phone = ""
+    def load_next(handle):
+        for item in upcoming:
+            try:
+                driver.switch_to.window(handle)
+                # Non-blocking navigation, unlike driver.get which waits for the load event
+                driver.execute_script("window.location.href = arguments[0];", item[1])
+            except Exception as e:
+                print(f"Failed to scrape a result: {e}")
+                continue
+            loading.append((handle, item))
+            return
 
-                    try:
-                        website = driver.find_element(By.CSS_SELECTOR, 'a[data-item-id="authority"]').get_attribute("href")
-                    except Exception as e:
-                        website = ""
+    try:
+        for handle in handles:
+            load_next(handle)
+        while loading:
+            handle, (idx, href) = loading.popleft()
+            driver.switch_to.window(handle)
+            # A reused tab still shows its previous listing until the new navigation commits
+            if not wait_until(driver, on_listing(href), "tab_navigate"):
+                print(f"Tab never reached listing {idx + 1}, skipping it: {href}")
+                load_next(handle)
+                continue
+            yield idx, href
+            # Close any window the listing opened on its own (e.g. the website link)
+            for stray in set(driver.window_handles) - set(handles):
+                driver.switch_to.window(stray)
+                driver.close()
+            load_next(handle)
+    finally:
+        try:
+            for handle in handles[1:]:
+                if handle in driver.window_handles:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(main)
+        except Exception:
+            pass  # the driver's session is already gone
+
+def scrape_listing(driver, href, idx, total, query, ticket=None):
+    """Extract the listing driver is on. Returns scraped_data, or None to skip.
+
+    With an OrgTicket, the org write is queued before the review scroll and
+    reviews are streamed to the writer in REVIEW_WINDOW chunks.
+    """
+    with METRICS.stage("listing_load"):
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'h1.DUwDvf'))
+        )
+        # The address row renders just after the title
+        wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, '[data-item-id="address"]')), "listing_settle")
+
+    snap = snapshot_place(driver)
+    record_snapshot("place", listing_key(href), driver)
+    capture = network_capture_for(driver)
+    place_url = driver.current_url
+    network_place = capture.place_for(place_url) if capture else None
+    if network_place:
+        apply_network_place(snap, network_place)
+    if snap.missing:
+        print(f"Listing {idx + 1} has no {', '.join(snap.missing)}")
+
+    name_raw = (snap.name_raw or "").strip()
+    name = clean_name(name_raw)
+
+    if snap.address_label:
+        addr = snap.address_label.replace("Address: ", "")
+        zip_code = extract_zip(addr)
+        address = normalize_address(addr)
+    else:
+        address = "No Address Available"
+        zip_code = ""
+
+    phone = clean_phone(snap.phone_label.replace("Phone: ", "").strip()) if snap.phone_label else ""
+    website = snap.website or ""
+
+    # Skip records missing name or address
+    if not name or not address:
+        print(f"⚠️ Skipped listing {idx + 1} due to missing name or address.")
+        if capture:
+            capture.forget(place_url)
+        return None
 
-                    # Skip records missing name or address
-                    if not name or not address:
-                        print(f"⚠️ Skipped listing {idx + 1} due to missing name or address.")
-                        continue
+    detail_link = snap.url or driver.current_url
+    lat, lng, place_id = parse_place_url(detail_link)
+
+    with METRICS.stage("share_link"):
+        short_link = get_share_link(driver)
+
+    rating = snap.rating
+    with METRICS.stage("hours"):
+        hours = snapshot_hours(driver, snap)
+    excerpt = snap.excerpt or ""
+
+    scraped_data = {
+        "Search Query": query,
+        "Name Raw": name_raw,
+        "Name": name,
+        "Slug": slugify(name_raw),
+        "Address": address,
+        "Phone": phone,
+        "Rating": rating,
+        "Website": website,
+        "Website Domain": extract_domain(website),
+        "Google Place URL": short_link if short_link else detail_link,
+        "Latitude": lat,
+        "Longitude": lng,
+        "Place ID": place_id,
+        "Hours": hours,
+        "ids.external": place_id,
+        "review_excerpt": excerpt,
+        "review_count": snap.review_count,
+        "reviews": [],
+        "ZIP": zip_code,
+        "Source": "google_maps",
+    }
+
+    # Ensure Phone and ZIP fields are explicitly stored as text before CSV export
+    scraped_data["Phone"] = str(scraped_data["Phone"]) if scraped_data["Phone"] else ""
+    scraped_data["ZIP"] = str(scraped_data["ZIP"]) if scraped_data["ZIP"] else ""
+
+    known_ids = None
+    if INCREMENTAL_REVIEWS:
+        # Read-only lookup: ORG_INDEX has its own lock, so this never waits
+        # on the writer thread's DB I/O under WRITE_LOCK
+        org_match = match_existing_org(name, phone, website, address, lat, lng)
+        if org_match:
+            known_ids = known_review_ids(org_match.id)
+    stream = None
+    if ticket:
+        # Queue the org ahead of the review windows that will reference it
+        stream = ReviewStream(ticket)
+        submit_traced(persist_listing, dict(scraped_data), ticket)
+    print(f"Scraping listing {idx + 1}/{total}: {href}")
+    print("Starting review scroll attempts...")
+    reviews = extract_reviews(driver, capture, known_ids, stream)
+    if capture:
+        capture.forget(place_url)
+    record_snapshot("reviews", listing_key(href), driver)
+    # Print concise review extraction summary (extract_reviews() prints the failures itself)
+    print(f"Reviews scraped: {stream.sent if stream else len(reviews)}")
+
+    scraped_data["reviews"] = reviews
+    # The count Maps displays is stable between scrapes and goes into the org
+    # hash; how many reviews a scroll loaded is only a fallback without one
+    if not snap.review_count:
+        scraped_data["review_count"] = stream.sent if stream else len(reviews)
+    return scraped_data
+
+def _match_listing(scraped_data):
+    return match_existing_org(
+        scraped_data["Name"], scraped_data["Phone"], scraped_data["Website"], scraped_data["Address"],
+        scraped_data["Latitude"], scraped_data["Longitude"]
+    )
 
-                    detail_link = driver.current_url
-                    try:
-                        parts = re.findall(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)", detail_link)
-                        lat, lng = map(float, parts[0]) if parts else (None, None)
-
-                        place_id_match = re.search(r"!16s%2Fg%2F([^!&]+)", detail_link)
-                        if place_id_match:
-                            raw_place_id = place_id_match.group(1)
-                            place_id = urllib.parse.unquote(raw_place_id).split("?")[0]
-                        else:
-                            place_id = None
-                    except Exception as e:
-                        lat, lng, place_id = None, None, None
+def persist_listing(scraped_data, ticket=None):
+    """Match scraped_data to an org, write it and its reviews.
+
+    Returns (org_id, db_action); org_id is None when the org write failed.
+    Both are also stored on ticket, if given.
+    """
+    with WRITE_LOCK:
+        with METRICS.stage("match"):
+            org_match = _match_listing(scraped_data)
+        with METRICS.stage("db_write"):
+            org_id, db_action = write_org(scraped_data, org_match)
+        if org_id:
+            REVIEW_SINK.add_many(scraped_data["reviews"], org_id)
+    if ticket:
+        ticket.org_id, ticket.db_action = org_id, db_action
+    return org_id, db_action
+
+def persist_listings(listings):
+    """persist_listing for a whole query's listings, with one org upsert round trip.
+
+    Returns (org_id, db_action) per listing, in order.
+    """
+    with WRITE_LOCK:
+        with METRICS.stage("match"):
+            matches = [_match_listing(data) for data in listings]
+            same_as = _batch_duplicates(listings, matches)
+        with METRICS.stage("db_write"):
+            firsts = [i for i, dup in enumerate(same_as) if dup is None]
+            results = [(None, None)] * len(listings)
+            written = upsert_organizations(
+                [listings[i] for i in firsts], [matches[i].id if matches[i] else None for i in firsts]
+            )
+            for i, result in zip(firsts, written):
+                results[i] = result
+            # Later listings of a business written above update its org, as they would one at a time
+            # (or are written on their own if that first write failed)
+            dups = [i for i, dup in enumerate(same_as) if dup is not None]
+            written = upsert_organizations([listings[i] for i in dups], [results[same_as[i]][0] for i in dups])
+            for i, result in zip(dups, written):
+                results[i] = result
+        for data, (org_id, db_action) in zip(listings, results):
+            if not org_id:
+                print(f"DB write failed for {data['Name']}")
+                continue
+            _org_written(org_id, data, db_action)
+            REVIEW_SINK.add_many(data["reviews"], org_id)
+    return results
+
+def _batch_duplicates(listings, matches):
+    """For each unmatched listing, the position of an earlier one in the batch for the same business.
+
+    persist_listings matches a batch before writing any of it, so ORG_INDEX
+    can't match a listing to one inserted earlier in the same batch; a
+    throwaway OrgIndex of the batch's own new listings does instead.
+    """
+    batch_index = OrgIndex()
+    same_as = [None] * len(listings)
+    for i, (data, org) in enumerate(zip(listings, matches)):
+        if org:
+            continue
+        first = _best_match(
+            data["Name"], data["Phone"], data["Website"], data["Address"],
+            data["Latitude"], data["Longitude"], index=batch_index,
+        )
+        if first:
+            same_as[i] = first.id
+        else:
+            batch_index.add(org_row(i, data))
+    return same_as
 
-                    short_link = get_share_link(driver)
+def write_org(scraped_data, org_match):
+    """Upsert scraped_data onto org_match (or a new org); caller holds WRITE_LOCK."""
+    org_id, db_action = upsert_organization(scraped_data, org_match.id if org_match else None)
+    if not org_id:
+        print(f"DB write failed for {scraped_data['Name']}")
+        return None, None
+    _org_written(org_id, scraped_data, db_action)
+    return org_id, db_action
 
-                    try:
-                        rating_text = driver.find_element(By.CSS_SELECTOR, 'div.fontDisplayLarge').text.strip()
-                        rating = float(rating_text)
-                    except:
-                        rating = None
-
-                    hours = extract_hours(driver)
-                    excerpt = driver.find_element(By.CSS_SELECTOR, 'span.wiI7pd').text.strip() if driver.find_elements(By.CSS_SELECTOR, 'span.wiI7pd') else ""
-
-                    review_count = extract_review_count(driver)
-                    print(f"Scraping listing {idx + 1}/{len(listing_urls)}: {href}")
-                    print("Starting review scroll attempts...")
-                    reviews = extract_reviews(driver)
-                    failed_reviews = 0  # Default, will be set by extract_reviews if available
-                    if isinstance(reviews, list):
-                        failed_reviews = 0  # extract_reviews() prints the count itself
-                    scraped_data = {
-                        "Search Query": query,
-                        "Name Raw": name_raw,
-                        "Name": name,
-                        "Slug": slugify(name_raw),
-                        "Address": address,
-                        "Phone": phone,
-                        "Rating": rating,
-                        "Website": website,
-                        "Website Domain": extract_domain(website),
-                        "Google Place URL": short_link if short_link else detail_link,
-                        "Latitude": lat,
-                        "Longitude": lng,
-                        "Place ID": place_id,
-                        "Hours": hours,
-                        "ids.external": place_id,
-                        "review_excerpt": excerpt,
-                        "review_count": len(reviews),
-                        "reviews": reviews,
-                        "ZIP": zip_code,
-                        "Source": "google_maps",
-                    }
-
-                    # Ensure Phone and ZIP fields are explicitly stored as text before CSV export
-                    scraped_data["Phone"] = str(scraped_data["Phone"]) if scraped_data["Phone"] else ""
-                    scraped_data["ZIP"] = str(scraped_data["ZIP"]) if scraped_data["ZIP"] else ""
-
-                    # Append every successfully scraped listing to all_data immediately after extraction
-                    all_data.append(scraped_data)
-
-                    # ---- SUMMARY PRINTS ----
-                    print(f"[{idx + 1}/{len(listing_urls)}] Processing: {name}")
-
-                    org_match = match_existing_org(name, phone, website, address, lat, lng)
-
-                    # Print concise review extraction summary
-                    print(f"Reviews scraped: {len(reviews)} | Reviews failed: {failed_reviews}")
-
-                    db_action = None
-                    org_id = None
-                    if org_match:
-                        with WRITE_CONN.cursor() as cur:
-                            cur.execute("SELECT id FROM organizations WHERE id = %s", (org_match[0],))
-                            exists_in_write = cur.fetchone()
-
-                        if exists_in_write:
-                            if not org_data_changed(org_match, scraped_data):
-                                db_action = "no_update"
-                            else:
-                                # Update
-                                with WRITE_CONN.cursor() as cur:
-                                    cur.execute("""
-                                        UPDATE organizations SET
-                                            name = %s,
-                                            name_raw = %s,
-                                            slug = %s,
-                                            phones = %s::jsonb,
-                                            website = %s::jsonb,
-                                            addresses = %s::jsonb,
-                                            google_rating = %s::double precision,
-                                            review_count = %s::integer,
-                                            avg_rating = %s::double precision,
-                                            source_ids = %s::jsonb,
-                                            ids = %s::jsonb,
-                                            hours = %s::jsonb,
-                                            review_excerpt = %s,
-                                            canonical_abbr = %s,
-                                            geom_m = ST_SetSRID(ST_MakePoint(%s, %s), 4326),
-                                            google_place_url = %s,
-                                            website_domain = %s,
-                                            source = %s
-                                        WHERE id = %s
-                                    """, (
-                                        scraped_data["Name"],
-                                        scraped_data["Name Raw"],
-                                        scraped_data["Slug"],
-                                        json.dumps([scraped_data["Phone"]]) if scraped_data["Phone"] else json.dumps([]),
-                                        json.dumps([scraped_data["Website"]]) if scraped_data["Website"] else json.dumps([]),
-                                        json.dumps({"address": scraped_data["Address"], "zip": scraped_data["ZIP"]}),
-                                        float(scraped_data["Rating"]) if scraped_data.get("Rating") else None,
-                                        int(scraped_data["review_count"]) if scraped_data.get("review_count") else None,
-                                        float(scraped_data["Rating"]) if scraped_data.get("Rating") else None,
-                                        json.dumps({"google_place_id": scraped_data["Place ID"]}),
-                                        json.dumps({"external": scraped_data["Place ID"]}),
-                                        json.dumps({"hours_text": scraped_data["Hours"]}) if scraped_data.get("Hours") else json.dumps({"hours_text": "Unavailable"}),
-                                        scraped_data.get("review_excerpt"),
-                                        scraped_data.get("canonical_abbr") or "",
-                                        float(scraped_data["Longitude"]) if scraped_data.get("Longitude") else None,
-                                        float(scraped_data["Latitude"]) if scraped_data.get("Latitude") else None,
-                                        scraped_data.get("Google Place URL"),
-                                        scraped_data.get("Website Domain"),
-                                        scraped_data.get("Source"),
-                                        org_match[0]
-                                    ))
-                                    WRITE_CONN.commit()
-                                db_action = "updated"
-                            org_id = org_match[0]
-                        else:
-                            # Insert into write DB
-                            org_insert_payload = {
-                                "Name": scraped_data.get("Name"),
-                                "Name Raw": scraped_data.get("Name Raw"),
-                                "Slug": scraped_data.get("Slug"),
-                                "Phone": scraped_data.get("Phone"),
-                                "Website": scraped_data.get("Website"),
-                                "Address": scraped_data.get("Address"),
-                                "Rating": scraped_data.get("Rating"),
-                                "review_count": scraped_data.get("review_count"),
-                                "Place ID": scraped_data.get("Place ID"),
-                                "Hours": scraped_data.get("Hours"),
-                                "Longitude": scraped_data.get("Longitude"),
-                                "Latitude": scraped_data.get("Latitude"),
-                                "Google Place URL": scraped_data.get("Google Place URL"),
-                                "Website Domain": scraped_data.get("Website Domain"),
-                                "review_excerpt": scraped_data.get("review_excerpt"),
-                                "canonical_abbr": scraped_data.get("canonical_abbr") or "",
-                            }
-                            inserted_id = insert_organization(org_insert_payload)
-                            if inserted_id:
-                                org_id = inserted_id
-                                db_action = "inserted"
-                                EXISTING_ORGS.append((
-                                    org_id, scraped_data["Name"], json.dumps([scraped_data["Phone"]]) if scraped_data["Phone"] else json.dumps([]),
-                                    json.dumps([scraped_data["Website"]]) if scraped_data["Website"] else json.dumps([]),
-                                    json.dumps({"address": scraped_data["Address"], "zip": scraped_data["ZIP"]})
-                                ))
-                            else:
-                                print(f"DB insert failed for {name}")
-                                continue
-                    else:
-                        # Insert new org
-                        org_id = insert_organization(scraped_data)
-                        if org_id:
-                            db_action = "inserted"
-                            EXISTING_ORGS.append((
-                                org_id, scraped_data["Name"], json.dumps([scraped_data["Phone"]]) if scraped_data["Phone"] else json.dumps([]),
-                                json.dumps([scraped_data["Website"]]) if scraped_data["Website"] else json.dumps([]),
-                                json.dumps({"address": scraped_data["Address"], "zip": scraped_data["ZIP"]})
-                            ))
-                        else:
-                            print(f"Skipping org due to DB insert failure: {name}")
-                            continue
-
-                    if org_id:
-                        for rev in reviews:
-                            insert_review(rev, org_id)
-
-                    elapsed_time = f"{(datetime.now() - scrape_start).total_seconds():.2f}"
-                    print(f"Finished {idx + 1}/{len(listing_urls)}: {name} in {elapsed_time} seconds\n")
-
-                    for _ in range(5):
-                        if dismiss_overlay(driver):
-                            time.sleep(0.5)
-                        else:
-                            break
+ORG_DELTA_COUNTERS = {"inserted": "orgs_new", "updated": "orgs_changed", "no_update": "orgs_unchanged"}
 
-                    time.sleep(0.2)
+def _org_written(org_id, scraped_data, db_action):
+    METRICS.inc(ORG_DELTA_COUNTERS[db_action])
+    if db_action == "inserted":
+        ORG_INDEX.add(org_row(org_id, scraped_data))
 
-                except Exception as e:
-                    if "SSL connection has been closed" in str(e):
-                        print("SSL error detected, restarting browser and reconnecting DB...")
-                        driver.quit()
-                        time.sleep(3)
-                        driver_path = "/opt/homebrew/bin/chromedriver"
-                        driver = webdriver.Chrome(service=Service(driver_path), options=options)
-                        READ_CONN.close()
-                        WRITE_CONN.close()
-                        READ_CONN = psycopg2.connect(os.getenv("READ_DB_URL"))
-                        WRITE_CONN = psycopg2.connect(os.getenv("WRITE_DB_URL"))
-                    else:
-                        print(f"Failed to scrape a result: {e}")
-                    continue
+# ─────────────────────────────────────────────
+# ✍️ Write-Behind DB Writer
+# ─────────────────────────────────────────────
+# GOOGLE_WRITE_BEHIND=0 runs every DB write inline on the browser thread
+WRITE_BEHIND = os.getenv("GOOGLE_WRITE_BEHIND", "1") != "0"
+WRITE_QUEUE_SIZE = int(os.getenv("GOOGLE_WRITE_QUEUE_SIZE", "50"))
+
+class WriteBehind:
+    """Bounded queue of DB jobs drained by one background writer thread.
+
+    Browser threads submit a job per listing and keep extracting. Jobs run
+    strictly in submission order, and each listing job writes its org before
+    its reviews, so the org id is always known first. submit() blocks when
+    the queue is full (backpressure); close() drains everything queued.
+    """
+
+    _STOP = object()
+
+    def __init__(self, maxsize=WRITE_QUEUE_SIZE):
+        self.jobs = queue.Queue(maxsize=maxsize)
+        self.done = 0
+        self.failed = 0
+        self.blocked_seconds = 0.0
+        self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args):
+        start = time.time()
+        self.jobs.put((fn, args))
+        self.blocked_seconds += time.time() - start
+
+    def _run(self):
+        while True:
+            try:
+                job = self.jobs.get(timeout=REVIEW_FLUSH_SECONDS)
+            except queue.Empty:
+                job = None
+            if job is self._STOP:
+                break
+            if job is None:
+                # An idle writer still gets buffered reviews out on time
+                self._flush_due()
+                continue
+            fn, args = job
+            try:
+                fn(*args)
+                self.done += 1
+            except Exception as e:
+                # Dropped connections were already retried inside DBPool.run
+                print(f"DB writer job failed: {e}")
+                self.failed += 1
+            self._flush_due()
 
-            # Save all listings for this city/query (all_data contains all scraped so far)
-            city_name = query.replace("garage door repair", "").strip().replace(" ", "_").replace(",", "")
-            filename = f"GDH_{city_name}.csv"
+    def _flush_due(self):
+        try:
+            REVIEW_SINK.flush_due()
+        except Exception as e:
+            print(f"Timed review flush failed: {e}")
+
+    def close(self):
+        self.jobs.put(self._STOP)
+        self.thread.join()
+        print(f"DB writer drained: {self.done} jobs done, {self.failed} failed, "
+              f"browser blocked {self.blocked_seconds:.1f}s on a full queue")
+
+WRITER = None
+
+def submit_write(fn, *args):
+    if WRITER is not None:
+        WRITER.submit(fn, *args)
+    else:
+        fn(*args)
+
+def submit_traced(fn, *args):
+    # submit_write that records fn's stages in the current listing's trace
+    submit_write(METRICS.traced, METRICS.current_trace(), fn, *args)
+
+def start_writer():
+    global WRITER
+    if WRITE_BEHIND and WRITER is None:
+        WRITER = WriteBehind()
+
+def stop_writer():
+    global WRITER
+    if WRITER is not None:
+        WRITER.close()
+        WRITER = None
+
+# GOOGLE_ORG_BATCH=1 holds a query's orgs until the query ends and upserts
+# them in one statement (persist_listings). Streamed review windows need
+# their org id up front, so listings with a ticket are still written alone.
+ORG_BATCH = os.getenv("GOOGLE_ORG_BATCH", "0") == "1"
+PENDING_ORGS = []
+
+def write_listing(scraped_data, query, href, tracker=None, freshness=None, card=None, ticket=None):
+    if ticket:
+        # Written ahead of its streamed reviews by scrape_listing
+        org_id, db_action = ticket.org_id, ticket.db_action
+    elif ORG_BATCH:
+        with WRITE_LOCK:
+            PENDING_ORGS.append((scraped_data, query, href, tracker, freshness, card))
+        return None, "queued"
+    else:
+        org_id, db_action = persist_listing(scraped_data)
+    if org_id:
+        _after_org_write(org_id, scraped_data, query, href, tracker, freshness, card)
+    return org_id, db_action
+
+def _after_org_write(org_id, scraped_data, query, href, tracker, freshness, card):
+    if tracker:
+        # Only mark the listing written once its buffered reviews are in the DB
+        REVIEW_SINK.on_flushed(lambda: tracker.mark_listing(query, href), org_id)
+    if freshness and card:
+        REVIEW_SINK.on_flushed(lambda: freshness.record(card, scraped_data), org_id)
+
+def flush_orgs():
+    with WRITE_LOCK:
+        pending = PENDING_ORGS[:]
+        PENDING_ORGS.clear()
+    if not pending:
+        return
+    results = persist_listings([entry[0] for entry in pending])
+    for entry, (org_id, _) in zip(pending, results):
+        if org_id:
+            _after_org_write(org_id, *entry)
+
+def flush_reviews():
+    flush_orgs()
+    REVIEW_SINK.flush()
+    print(REVIEW_SINK.report())
+
+def scrape_query(driver, query, label, all_data, journal=None, freshness=None, seen=None, on_done=None):
+    """Run one search query end to end on driver.
+
+    Returns the number of listings scraped, or None when the query failed
+    and should be retried. Listings already in the journal, claimed by an
+    earlier query in `seen`, or still fresh in the freshness cache are
+    skipped, and the query is marked done once every listing was written.
+    on_done(query, listings) is queued behind the query's writes, with
+    listings None unless the query and all of its listings went through.
+    """
+    start_time = datetime.now()
+    listings_scraped = 0
+    reported = False  # on_done is queued (directly or through tracker.finish)
+    print(f"\n--- Starting search {label}: {query} ---")
+    try:
+        with METRICS.stage("search_load"):
+            found = run_search(driver, query)
+        if not found:
+            if found is False and journal:
+                journal.mark_query(query)
+            result = 0 if found is False else None
+            reported = True
+            if on_done:
+                submit_write(on_done, query, result)
+            return result
+
+        with METRICS.stage("feed_scroll"):
+            cards = collect_listing_cards(driver)
+        listing_urls = [card["href"] for card in cards]
+        record_snapshot("search", query, driver)
+        print(f"Found {len(listing_urls)} listings. Extracting details...")
+
+        remaining = list(enumerate(listing_urls))
+        if journal:
+            remaining = [(idx, href) for idx, href in remaining if not journal.listing_done(href)]
+            if len(remaining) < len(listing_urls):
+                print(f"Skipping {len(listing_urls) - len(remaining)} listings already done in an earlier run")
+        if seen:
+            claimed = seen.claim(query, remaining)
+            duplicates = len(remaining) - len(claimed)
+            if duplicates:
+                print(f"Skipping {duplicates}/{len(remaining)} listings ({duplicates / len(remaining):.0%}) "
+                      f"already scraped for an earlier query this run")
+                METRICS.inc("listings_duplicate", duplicates)
+            remaining = claimed
+        if freshness:
+            fresh = [(idx, href) for idx, href in remaining if freshness.is_fresh(cards[idx])]
+            if fresh:
+                print(f"Skipping {len(fresh)} listings unchanged since they were last scraped")
+                METRICS.inc("listings_fresh", len(fresh))
+                remaining = [item for item in remaining if item not in fresh]
+        tracker = QueryTracker(query, [href for _, href in remaining], journal, on_done)
+        for idx, href in iter_listing_pages(driver, remaining, LISTING_TABS):
+            scrape_start = datetime.now()
+            METRICS.begin_listing()
+            ticket = OrgTicket() if REVIEW_WINDOW else None
             try:
-                save_to_csv(all_data, OUTPUT_DIR, filename)
-                total_saved = len(all_data)
-                print(f"Saved {total_saved} rows to {OUTPUT_DIR}/{filename}")
+                scraped_data = scrape_listing(driver, href, idx, len(listing_urls), query, ticket)
+                if not scraped_data:
+                    METRICS.end_listing(query, href, "skipped")
+                    tracker.mark_listing(query, href)
+                    continue
+                name = scraped_data["Name"]
+
+                # Append every successfully scraped listing to all_data immediately after extraction
+                all_data.append(scraped_data)
+
+                # ---- SUMMARY PRINTS ----
+                print(f"[{idx + 1}/{len(listing_urls)}] Processing: {name}")
+
+                submit_traced(write_listing, scraped_data, query, href, tracker, freshness, cards[idx], ticket)
+                listings_scraped += 1
+                METRICS.end_listing(query, href, "scraped")
+
+                elapsed_time = f"{(datetime.now() - scrape_start).total_seconds():.2f}"
+                print(f"Finished {idx + 1}/{len(listing_urls)}: {name} in {elapsed_time} seconds\n")
+
+                # dismiss_overlay waits for each overlay to close
+                for _ in range(5):
+                    if not dismiss_overlay(driver):
+                        break
+
             except Exception as e:
-                print(f"CSV save failed: {e}")
+                METRICS.end_listing(query, href, "failed")
+                print(f"Failed to scrape a result: {e}")
+                continue
+
+        submit_write(flush_reviews)
 
-            print(f"Finished query '{query}' in {(datetime.now() - start_time).total_seconds():.2f} seconds")
-            time.sleep(random.uniform(1, 3))
+        # Save all listings for this city/query (all_data contains all scraped so far)
+        city_name = query.replace("garage door repair", "").strip().replace(" ", "_").replace(",", "")
+        filename = f"GDH_{city_name}.csv"
+        try:
+            save_to_csv(all_data, OUTPUT_DIR, filename)
+            total_saved = len(all_data)
+            print(f"Saved {total_saved} rows to {OUTPUT_DIR}/{filename}")
+        except Exception as e:
+            print(f"CSV save failed: {e}")
+
+        # Queued behind this query's listing writes and review flush, so
+        # failed listings (scrape, navigation or write) keep the query open
+        submit_write(tracker.finish, listings_scraped)
+        reported = True
+        print(f"Finished query '{query}' in {(datetime.now() - start_time).total_seconds():.2f} seconds")
+        driver_profile_report(driver, query)
+        pause_between_queries()
+
+    except Exception as e:
+        print(f"Error on '{query}': {type(e).__name__} - {e}")
+        if on_done and not reported:
+            submit_write(on_done, query, None)
+        return None
+    return listings_scraped
 
+def scrape_google_maps(queries, wait_time=3, limit=None, workers=1, jobs=None):
+    if limit:
+        queries = queries[:limit]
+    init_scraper()
+
+    # The job table, not a node's journal, decides what a job run has left
+    journal = None if jobs else open_run_journal()
+    run_queries = queries
+    if jobs:
+        jobs.seed(queries)
+    elif journal:
+        pending = [q for q in queries if not journal.query_done(q)]
+        if len(pending) < len(queries):
+            print(f"Resuming: skipping {len(queries) - len(pending)} queries finished in an earlier run")
+        queries = pending
+    freshness = open_freshness_cache()
+    seen = SeenPlaces() if DEDUP_LISTINGS else None
+
+    start_writer()
+    metrics_server = start_metrics()
+    if workers > 1 or jobs:
+        try:
+            return scrape_google_maps_pool(queries, workers, journal, freshness, seen, jobs)
+        finally:
+            if seen:
+                seen.report()
+            stop_writer()
+            flush_reviews()
+            if jobs:
+                # After the writer drained, so every queued finish() has run
+                jobs.stop()
+                jobs.report()
+            wait_report()
+            stop_metrics(metrics_server)
+            if journal:
+                close_run_journal(journal, run_queries)
+            if freshness:
+                freshness.close()
+
+    options = build_chrome_options()
+    driver = start_chrome(options)
+
+    all_data = []
+
+    script_start = datetime.now()
+    print(f"Running Google Maps Scraper for {len(queries)} queries (limit={limit})")
+
+    print(f"Setup completed in {(datetime.now() - script_start).total_seconds():.2f} seconds, starting scrape...")
+    try:
+        for i, query in enumerate(queries, 1):
+            scrape_query(driver, query, f"{i}/{len(queries)}", all_data, journal, freshness, seen)
             # Clear all_data for next city if you want per-city CSVs only, but if you want a global CSV at the end, comment this out
             all_data.clear()
+    finally:
+        driver.quit()
+        stop_writer()
+        flush_reviews()
+        wait_report()
+        if seen:
+            seen.report()
+        stop_metrics(metrics_server)
+        if journal:
+            close_run_journal(journal, run_queries)
+        if freshness:
+            freshness.close()
+    return all_data
+
+# ─────────────────────────────────────────────
+# 🧵 Parallel Chrome Worker Pool
+# ─────────────────────────────────────────────
+class WorkerStats:
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.listings = 0
+        self.started = time.time()
+
+    def summary(self):
+        elapsed = time.time() - self.started
+        per_min = self.listings / elapsed * 60 if elapsed else 0.0
+        return (f"[{self.name}] {self.queries} queries, {self.listings} listings "
+                f"in {elapsed:.0f}s ({per_min:.1f} listings/min)")
+
+# Consecutive next_query() failures after which a worker gives up
+WORKER_ERROR_LIMIT = 5
+
+def _pool_worker(next_query, stats, journal, freshness=None, seen=None, on_done=None):
+    options = build_chrome_options()
+    try:
+        driver = start_chrome(options)
+    except Exception as e:
+        print(f"[{stats.name}] Chrome failed to start: {e}")
+        return
+    all_data = []
+    errors = 0
+    try:
+        while True:
+            try:
+                item = next_query()
+                errors = 0
+            except Exception as e:
+                # e.g. the job table is unreachable even after DBPool's retries
+                errors += 1
+                print(f"[{stats.name}] Could not get the next query ({errors}/{WORKER_ERROR_LIMIT}): "
+                      f"{type(e).__name__} - {e}")
+                if errors >= WORKER_ERROR_LIMIT:
+                    break
+                time.sleep(min(2 ** errors, 30))
+                continue
+            if item is None:
+                break
+            label, query = item
+            # scrape_query queues on_done behind the query's writes and review flush
+            saved = scrape_query(
+                driver, query, f"{label} ({stats.name})", all_data, journal, freshness, seen, on_done
+            )
+            all_data.clear()
+            stats.queries += 1
+            stats.listings += saved or 0
+            print(stats.summary())
+    finally:
+        driver.quit()
+
+def scrape_google_maps_pool(queries, workers, journal=None, freshness=None, seen=None, jobs=None):
+    """Scrape queries with `workers` headless Chrome instances in threads.
+
+    Each worker owns its own driver and pulls queries from a shared queue,
+    or claims them from the job table when `jobs` is a JobQueue; matching
+    and DB writes go through WRITE_LOCK in persist_listing.
+    """
+    on_done = None
+    if jobs:
+        next_query, on_done = jobs.next_query, jobs.finish
+        print(f"Running Google Maps Scraper for job run '{jobs.run_id}' as {jobs.node} with {workers} workers")
+        jobs.start()
+    else:
+        query_queue = queue.Queue()
+        for i, query in enumerate(queries, 1):
+            query_queue.put((i, query))
+
+        def next_query():
+            try:
+                i, query = query_queue.get_nowait()
+            except queue.Empty:
+                return None
+            return f"{i}/{len(queries)}", query
+        print(f"Running Google Maps Scraper for {len(queries)} queries with {workers} workers")
+
+    run_start = time.time()
+    stats = [WorkerStats(f"worker-{n}") for n in range(1, workers + 1)]
+    threads = [
+        threading.Thread(target=_pool_worker, args=(next_query, s, journal, freshness, seen, on_done),
+                         name=s.name)
+        for s in stats
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    elapsed = time.time() - run_start
+    total_listings = sum(s.listings for s in stats)
+    print("\n--- Worker throughput ---")
+    for s in stats:
+        print(s.summary())
+    print(f"Total: {total_listings} listings in {elapsed:.0f}s "
+          f"({total_listings / elapsed * 60 if elapsed else 0.0:.1f} listings/min)")
+    return []
 
+# ─────────────────────────────────────────────
+# 🛰️ Distributed Job Queue (several nodes, one run)
+# ─────────────────────────────────────────────
+# GOOGLE_JOB_RUN=<run id> moves the run's queries into the scrape_jobs table
+# (sql/scrape_jobs.sql) on the write database. Every node seeds the same run
+# (a no-op once seeded) and claims batches with FOR UPDATE SKIP LOCKED, so
+# no two nodes hold the same query. A heartbeat thread keeps extending the
+# lease on claimed jobs; when a node dies its leases run out and the next
+# claim puts those jobs back to pending.
+JOB_RUN_ID = os.getenv("GOOGLE_JOB_RUN", "")
+JOB_NODE = os.getenv("GOOGLE_JOB_NODE") or f"{socket.gethostname()}-{os.getpid()}"
+JOB_BATCH = int(os.getenv("GOOGLE_JOB_BATCH", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("GOOGLE_JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("GOOGLE_JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_SECONDS = 15
+
+class JobQueue:
+    """This node's side of one run in scrape_jobs.
+
+    next_query() hands claimed queries to worker threads, claiming a new
+    batch when the local one runs out, and finish() records each outcome;
+    it is queued on the DB writer behind the query's own writes.
+    Only jobs still claimed by this node are ever updated, so a node that
+    lost a lease cannot overwrite the node that took the job over.
+    """
+
+    def __init__(self, run_id, node=JOB_NODE, batch=JOB_BATCH, lease=JOB_LEASE_SECONDS):
+        self.run_id = run_id
+        self.node = node
+        self.batch = batch
+        self.lease = lease
+        self.lock = threading.Lock()
+        self.claimed = deque()  # (job_id, query) claimed but not handed out yet
+        self.held = {}          # query -> job_id until finish()
+        self.done = 0
+        self.failed = 0
+        self.stopped = threading.Event()
+        self.heartbeat_thread = None
+
+    def seed(self, queries):
+        def work(cur):
+            return execute_values(cur, """
+                INSERT INTO scrape_jobs (run_id, query) VALUES %s
+                ON CONFLICT (run_id, query) DO NOTHING
+                RETURNING id
+            """, [(self.run_id, q) for q in queries], page_size=1000, fetch=True)
+        added = len(WRITE_DB.run(work))
+        print(f"Job run '{self.run_id}': seeded {added} of {len(queries)} queries "
+              f"({len(queries) - added} already queued)")
+
+    def requeue_expired(self):
+        rows = WRITE_DB.fetchall("""
+            UPDATE scrape_jobs
+            SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                node = NULL, lease_until = NULL
+            WHERE run_id = %s AND status = 'claimed' AND lease_until < now()
+            RETURNING query, status
+        """, (JOB_MAX_ATTEMPTS, self.run_id))
+        for query, status in rows:
+            print(f"Lease expired on '{query}', {'giving up' if status == 'failed' else 're-queued'}")
+
+    def _claim(self):
+        rows = WRITE_DB.fetchall("""
+            UPDATE scrape_jobs
+            SET status = 'claimed', node = %s, attempts = attempts + 1, claimed_at = now(),
+                heartbeat_at = now(), lease_until = now() + make_interval(secs => %s)
+            WHERE id IN (
+                SELECT id FROM scrape_jobs
+                WHERE run_id = %s AND status = 'pending'
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, query
+        """, (self.node, self.lease, self.run_id, self.batch))
+        for job_id, query in sorted(rows):
+            self.claimed.append((job_id, query))
+            self.held[query] = job_id
+
+    def _others_outstanding(self):
+        # Jobs another node may still hand back through an expired lease
+        return WRITE_DB.fetchone("""
+            SELECT count(*) FROM scrape_jobs
+            WHERE run_id = %s AND (status = 'pending' OR (status = 'claimed' AND node <> %s))
+        """, (self.run_id, self.node))[0]
+
+    def next_query(self):
+        """Next (label, query) for a worker, or None once the run has nothing left."""
+        while not self.stopped.is_set():
+            with self.lock:
+                if not self.claimed:
+                    self.requeue_expired()
+                    self._claim()
+                if self.claimed:
+                    job_id, query = self.claimed.popleft()
+                    return f"job {job_id}", query
+                outstanding = self._others_outstanding()
+            if not outstanding:
+                return None
+            self.stopped.wait(JOB_POLL_SECONDS)
+        return None
+
+    def finish(self, query, listings):
+        """Mark the job done, or hand it back for a retry when listings is None.
+
+        scrape_query passes None when the query failed or any of its
+        listings was not written, so those listings get another attempt.
+        """
+        with self.lock:
+            job_id = self.held.pop(query, None)
+        if job_id is None:
+            return
+        try:
+            updated = self._finish(job_id, listings)
         except Exception as e:
-            print(f"Error on '{query}': {type(e).__name__} - {e}")
-            continue
+            # No longer held, so the heartbeat stops and the lease hands the job back
+            print(f"Could not record '{query}' ({type(e).__name__} - {e}); "
+                  f"it returns to pending when its lease expires")
+            return
+        if not updated:
+            print(f"Lost the lease on '{query}' before it finished; another node owns it now")
+
+    def _finish(self, job_id, listings):
+        if listings is None:
+            updated = WRITE_DB.execute("""
+                UPDATE scrape_jobs
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    node = NULL, lease_until = NULL
+                WHERE id = %s AND node = %s AND status = 'claimed'
+            """, (JOB_MAX_ATTEMPTS, job_id, self.node))
+            self.failed += updated
+        else:
+            updated = WRITE_DB.execute("""
+                UPDATE scrape_jobs
+                SET status = 'done', listings = %s, finished_at = now(), lease_until = NULL
+                WHERE id = %s AND node = %s AND status = 'claimed'
+            """, (listings, job_id, self.node))
+            self.done += updated
+        return updated
+
+    def heartbeat(self):
+        with self.lock:
+            job_ids = list(self.held.values())
+        if not job_ids:
+            return
+        kept = {row[0] for row in WRITE_DB.fetchall("""
+            UPDATE scrape_jobs
+            SET heartbeat_at = now(), lease_until = now() + make_interval(secs => %s)
+            WHERE id = ANY(%s) AND node = %s AND status = 'claimed'
+            RETURNING id
+        """, (self.lease, job_ids, self.node))}
+        lost = set(job_ids) - kept
+        if lost:
+            with self.lock:
+                # Jobs not started yet are dropped; one already running finds out in finish()
+                self.claimed = deque(job for job in self.claimed if job[0] not in lost)
+            print(f"Lost the lease on {len(lost)} jobs")
+
+    def _heartbeat_loop(self):
+        while not self.stopped.wait(self.lease / 3):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"Job heartbeat failed: {type(e).__name__} - {e}")
+
+    def start(self):
+        self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self.heartbeat_thread.start()
+
+    def stop(self):
+        """Stop the heartbeat and hand back jobs claimed but never started."""
+        self.stopped.set()
+        if self.heartbeat_thread:
+            self.heartbeat_thread.join()
+            self.heartbeat_thread = None
+        with self.lock:
+            unstarted = [job_id for job_id, _ in self.claimed]
+            self.claimed.clear()
+        if unstarted:
+            WRITE_DB.execute("""
+                UPDATE scrape_jobs
+                SET status = 'pending', node = NULL, lease_until = NULL, attempts = attempts - 1
+                WHERE id = ANY(%s) AND node = %s AND status = 'claimed'
+            """, (unstarted, self.node))
+
+    def report(self):
+        counts = dict(WRITE_DB.fetchall(
+            "SELECT status, count(*) FROM scrape_jobs WHERE run_id = %s GROUP BY status", (self.run_id,)
+        ))
+        print(f"\n--- Job run '{self.run_id}' ---")
+        print(f"{self.node}: {self.done} done, {self.failed} failed")
+        print("All nodes: " + ", ".join(f"{counts.get(s, 0)} {s}" for s in ("done", "failed", "claimed", "pending")))
 
-    driver.quit()
-    return all_data
 # ─────────────────────────────────────────────
 # Script Runner
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
-    queries = fetch_city_queries()
-    scrape_google_maps(queries)
+    with scraper_context():
+        queries = fetch_city_queries()
+        jobs = JobQueue(JOB_RUN_ID) if JOB_RUN_ID else None
+        scrape_google_maps(queries, workers=int(os.getenv("GOOGLE_WORKERS", "1")), jobs=jobs)
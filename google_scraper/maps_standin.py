@@ -0,0 +1,143 @@
+##Google_Maps local stand-in
+# Serves pages recorded with GOOGLE_SNAPSHOT_RECORD_DIR so scrape_google_maps
+# can run end to end with no network:
+#
+#   python google_scraper/maps_standin.py ./snapshots --port 8765 --latency 0.5
+#   GOOGLE_MAPS_URL=http://127.0.0.1:8765/maps python google_scraper/google_scraper.py
+#
+# Recorded pages have their scripts stripped. A small injected script stands
+# in for the two interactions the scraper needs: the Share dialog and the
+# switch to the Reviews tab.
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LIVE_ORIGIN = "https://www.google.com"
+
+HOME_PAGE = """<!doctype html>
+<html><body>
+<input id="searchboxinput" type="text">
+<button id="searchbox-searchbutton">Search</button>
+<script>
+document.getElementById('searchbox-searchbutton').addEventListener('click', function () {
+    var q = document.getElementById('searchboxinput').value;
+    window.location.href = '/maps/search/' + encodeURIComponent(q);
+});
+</script>
+</body></html>
+"""
+
+NO_RESULTS_PAGE = """<!doctype html>
+<html><body><input id="searchboxinput" type="text"><div>No results found</div></body></html>
+"""
+
+PLACE_SCRIPT = """
+<script>
+document.addEventListener('click', function (event) {
+    var tab = event.target.closest('button[role="tab"]');
+    if (tab && (tab.getAttribute('aria-label') || '').indexOf('Reviews for') === 0) {
+        fetch('/_standin/reviews' + window.location.pathname)
+            .then(function (r) { return r.ok ? r.text() : null; })
+            .then(function (html) {
+                if (html) {
+                    document.body.innerHTML = new DOMParser().parseFromString(html, 'text/html').body.innerHTML;
+                }
+            });
+        return;
+    }
+    if (event.target.closest('button[aria-label="Share"]')) {
+        var overlay = document.createElement('div');
+        overlay.className = 'hoUMge';
+        overlay.innerHTML = '<input class="vrsrZe"><button aria-label="Close">x</button>';
+        overlay.querySelector('input').value = window.location.href;
+        overlay.querySelector('button').addEventListener('click', function () { overlay.remove(); });
+        document.body.appendChild(overlay);
+    }
+}, true);
+</script>
+"""
+
+def snapshot_file(kind, key):
+    # Must match google_scraper.snapshot_file
+    return os.path.join(kind, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html")
+
+def listing_key(path):
+    return LIVE_ORIGIN + path.split("?")[0]
+
+class StandinHandler(BaseHTTPRequestHandler):
+    snapshot_dir = "."
+    latency = 0.0
+    jitter = 0.0
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _load(self, kind, key):
+        path = os.path.join(self.snapshot_dir, snapshot_file(kind, key))
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        # Keep the scraper on the stand-in when it follows recorded links
+        base = f"http://{self.headers.get('Host')}"
+        return html.replace(LIVE_ORIGIN + "/maps", base + "/maps")
+
+    def _send(self, status, html):
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        path = self.path
+        if path.split("?")[0] in ("/maps", "/maps/"):
+            return self._send(200, HOME_PAGE)
+        if path.startswith("/maps/search/"):
+            query = urllib.parse.unquote(path[len("/maps/search/"):].split("?")[0])
+            html = self._load("search", query)
+            return self._send(200, html) if html else self._send(200, NO_RESULTS_PAGE)
+        if path.startswith("/_standin/reviews/"):
+            html = self._load("reviews", listing_key(path[len("/_standin/reviews"):]))
+            return self._send(200, html) if html else self._send(404, "")
+        if path.startswith("/maps/place/"):
+            html = self._load("place", listing_key(path))
+            if not html:
+                return self._send(404, "<html><body>Not recorded</body></html>")
+            return self._send(200, html.replace("</body>", PLACE_SCRIPT + "</body>", 1))
+        self._send(404, "")
+
+def serve(snapshot_dir, port=8765, latency=0.0, jitter=0.0, background=False):
+    """Start the stand-in; with background=True return the server running in a thread."""
+    handler = type("Handler", (StandinHandler,), {
+        "snapshot_dir": snapshot_dir, "latency": latency, "jitter": jitter,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Serving {snapshot_dir} at http://127.0.0.1:{port}/maps (latency {latency}s + up to {jitter}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded Google Maps pages locally")
+    parser.add_argument("snapshot_dir")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds, up to this much")
+    args = parser.parse_args()
+    serve(args.snapshot_dir, args.port, args.latency, args.jitter)
@@ -0,0 +1,11 @@
+-- content_hash columns compared by the org and review upserts
+-- (_org_columns / review_content_hash: sha1 of the written fields).
+-- Run against the write database:
+--   psql "$WRITE_DB_URL" -f google_scraper/sql/content_hash.sql
+--
+-- Existing rows start with a NULL hash. Each is rewritten once, on its first
+-- re-scrape, and skipped from then on while its content stays the same.
+
+ALTER TABLE organizations ADD COLUMN IF NOT EXISTS content_hash text;
+
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS content_hash text;
@@ -0,0 +1,12 @@
+-- Unique google_id backing the org upserts (upsert_organization,
+-- upsert_organizations: ON CONFLICT (google_id)).
+-- Run against the write database, outside a transaction:
+--   psql "$WRITE_DB_URL" -f google_scraper/sql/org_google_id_unique.sql
+--
+-- The build fails if google_id already repeats. List the duplicates with
+--   SELECT google_id, array_agg(id ORDER BY id) FROM organizations
+--   WHERE google_id IS NOT NULL GROUP BY google_id HAVING count(*) > 1;
+-- and merge them first. NULL google_ids never conflict.
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS organizations_google_id_key
+    ON organizations (google_id);
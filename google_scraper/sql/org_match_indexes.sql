@@ -0,0 +1,25 @@
+-- Indexes backing ORG_MATCH_MODE=db (match_existing_org_db).
+-- Run against the read database, outside a transaction:
+--   psql "$READ_DB_URL" -f google_scraper/sql/org_match_indexes.sql
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ST_DWithin(geom_m, probe, radius)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS organizations_geom_m_gist
+    ON organizations USING gist (geom_m);
+
+-- phones ? '<phone>'
+CREATE INDEX CONCURRENTLY IF NOT EXISTS organizations_phones_gin
+    ON organizations USING gin (phones);
+
+-- website_domain = '<domain>'
+CREATE INDEX CONCURRENTLY IF NOT EXISTS organizations_website_domain_idx
+    ON organizations (website_domain);
+
+-- addresses->>'address' = '<address>'
+CREATE INDEX CONCURRENTLY IF NOT EXISTS organizations_address_idx
+    ON organizations ((addresses->>'address'));
+
+-- lower(name) % lower('<name>')
+CREATE INDEX CONCURRENTLY IF NOT EXISTS organizations_name_trgm
+    ON organizations USING gin (lower(name) gin_trgm_ops);
@@ -0,0 +1,28 @@
+-- Job table for distributed runs (GOOGLE_JOB_RUN, see JobQueue).
+-- Run against the write database once, before the first node starts:
+--   psql "$WRITE_DB_URL" -f google_scraper/sql/scrape_jobs.sql
+
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id           bigserial PRIMARY KEY,
+    run_id       text NOT NULL,
+    query        text NOT NULL,
+    status       text NOT NULL DEFAULT 'pending'
+                 CHECK (status IN ('pending', 'claimed', 'done', 'failed')),
+    node         text,
+    attempts     integer NOT NULL DEFAULT 0,
+    listings     integer,
+    claimed_at   timestamptz,
+    heartbeat_at timestamptz,
+    lease_until  timestamptz,
+    finished_at  timestamptz,
+    created_at   timestamptz NOT NULL DEFAULT now(),
+    UNIQUE (run_id, query)
+);
+
+-- claim: status = 'pending' ORDER BY id ... FOR UPDATE SKIP LOCKED
+CREATE INDEX IF NOT EXISTS scrape_jobs_pending_idx
+    ON scrape_jobs (run_id, id) WHERE status = 'pending';
+
+-- requeue: status = 'claimed' AND lease_until < now()
+CREATE INDEX IF NOT EXISTS scrape_jobs_lease_idx
+    ON scrape_jobs (run_id, lease_until) WHERE status = 'claimed';